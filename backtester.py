@@ -0,0 +1,141 @@
+import time
+import logging
+import numpy as np
+from indicators import panel_indicators
+from strategy import long_signal, short_signal
+
+
+def first_crossing(values, starts, levels, above, block=64):
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.int64)
+    levels = np.asarray(levels, dtype=np.float64)
+    n = len(values)
+    result = np.full(len(starts), n, dtype=np.int64)
+    pending = np.flatnonzero(starts < n)
+    offset = 0
+    while pending.size:
+        idx = starts[pending, None] + offset + np.arange(block)
+        inside = idx < n
+        window = values[np.minimum(idx, n - 1)]
+        if above:
+            hit = inside & (window >= levels[pending, None])
+        else:
+            hit = inside & (window <= levels[pending, None])
+        found = hit.any(axis=1)
+        result[pending[found]] = idx[found, hit[found].argmax(axis=1)]
+        pending = pending[~found & (starts[pending] + offset + block < n)]
+        offset += block
+        block *= 2
+    return result
+
+
+class Backtester:
+    def __init__(self, long_settings, short_settings, initial_balance=100.0, utc_offset=None):
+        self.long_settings = long_settings
+        self.short_settings = short_settings
+        self.initial_balance = initial_balance
+        self.utc_offset = time.localtime().tm_gmtoff if utc_offset is None else utc_offset
+        self.logger = logging.getLogger('BotLogger')
+
+    def _side_trades(self, side, settings, signals, timestamps, high, low, close):
+        entries = np.flatnonzero(signals)
+        n = len(close)
+        if not entries.size:
+            return []
+        entry_prices = close[entries]
+        if side == 'LONG':
+            tp = entry_prices * (1 + settings['tp_percent'])
+            sl = entry_prices * (1 - settings['sl_percent'])
+            tp_idx = first_crossing(high, entries + 1, tp, above=True)
+            sl_idx = first_crossing(low, entries + 1, sl, above=False)
+        else:
+            tp = entry_prices * (1 - settings['tp_percent'])
+            sl = entry_prices * (1 + settings['sl_percent'])
+            tp_idx = first_crossing(low, entries + 1, tp, above=False)
+            sl_idx = first_crossing(high, entries + 1, sl, above=True)
+        # Aynı mumda hem TP hem SL görülürse sıralama bilinemez, kötü senaryo (SL) kabul edilir
+        exits = np.minimum(tp_idx, sl_idx)
+        won = tp_idx < sl_idx
+
+        trades = []
+        k = 0
+        while k < len(entries):
+            exit_idx = exits[k]
+            trade = {
+                'side': side,
+                'entry_time': int(timestamps[entries[k]]),
+                'entry_price': float(entry_prices[k]),
+                'tp_price': float(tp[k]),
+                'sl_price': float(sl[k]),
+            }
+            if exit_idx >= n:
+                trade.update({'exit_time': None, 'exit_price': None, 'reason': None})
+                trades.append(trade)
+                break
+            trade.update({
+                'exit_time': int(timestamps[exit_idx]),
+                'exit_price': float(tp[k] if won[k] else sl[k]),
+                'reason': 'TP' if won[k] else 'SL',
+            })
+            trades.append(trade)
+            k = np.searchsorted(entries, exit_idx, side='left')
+        return trades
+
+    def run(self, timestamps, high, low, close, disable_position="Hiçbiri", indicators=None):
+        started = time.perf_counter()
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+
+        if indicators is None:
+            indicators = panel_indicators(close)
+        rsi = indicators['rsi'][0]
+        ma7_distance = indicators['ma7_distance'][0] * 100
+        hours = ((timestamps + self.utc_offset) // 3600) % 24
+
+        trades = []
+        for side, settings, signal, disabled in (
+            ('LONG', self.long_settings, long_signal, "Long"),
+            ('SHORT', self.short_settings, short_signal, "Short"),
+        ):
+            if disable_position == disabled:
+                continue
+            with np.errstate(invalid='ignore'):
+                signals = signal(settings, rsi, ma7_distance) & np.isin(hours, settings['allowed_hours']) & ~np.isnan(rsi)
+            trades.extend(self._side_trades(side, settings, signals, timestamps, high, low, close))
+
+        closed = sorted((trade for trade in trades if trade['reason']), key=lambda trade: trade['exit_time'])
+        settings_by_side = {'LONG': self.long_settings, 'SHORT': self.short_settings}
+        returns = np.array([
+            (settings_by_side[trade['side']]['tp_percent'] if trade['reason'] == 'TP' else -settings_by_side[trade['side']]['sl_percent'])
+            * settings_by_side[trade['side']]['leverage'] / 15
+            for trade in closed
+        ])
+        equity = self.initial_balance * np.cumprod(1 + returns) if returns.size else np.array([])
+        balances = np.concatenate(([self.initial_balance], equity))
+        for trade, before, after in zip(closed, balances[:-1], balances[1:]):
+            trade['profit'] = float(after - before)
+            trade['balance'] = float(after)
+        peaks = np.maximum.accumulate(balances)
+        max_drawdown = float(np.max((peaks - balances) / peaks)) * 100
+
+        result = {
+            'trades': closed,
+            'open_trades': [trade for trade in trades if not trade['reason']],
+            'long_basarili': sum(1 for trade in closed if trade['side'] == 'LONG' and trade['reason'] == 'TP'),
+            'long_basarisiz': sum(1 for trade in closed if trade['side'] == 'LONG' and trade['reason'] == 'SL'),
+            'short_basarili': sum(1 for trade in closed if trade['side'] == 'SHORT' and trade['reason'] == 'TP'),
+            'short_basarisiz': sum(1 for trade in closed if trade['side'] == 'SHORT' and trade['reason'] == 'SL'),
+            'initial_balance': self.initial_balance,
+            'final_balance': float(balances[-1]),
+            'pnl': float(balances[-1] - self.initial_balance),
+            'max_drawdown': max_drawdown,
+            'candles': len(close),
+            'elapsed': time.perf_counter() - started,
+        }
+        self.logger.info(
+            f"Backtest tamamlandı: {len(close)} mum, {len(closed)} işlem, "
+            f"Kar/Zarar: {result['pnl']:.2f} USDT, Maks. Düşüş: {max_drawdown:.2f}%, {result['elapsed']:.3f} saniye"
+        )
+        return result
@@ -0,0 +1,113 @@
+import os
+import re
+import threading
+import time
+import logging
+import numpy as np
+from candle_sync import interval_seconds
+
+ARCHIVE_COLUMNS = (('time', np.int64), ('open', np.float64), ('high', np.float64), ('low', np.float64), ('close', np.float64), ('volume', np.float64))
+
+
+class CandleArchive:
+    def __init__(self, root="candle_archive", source="gateio_futures", max_points=2000):
+        self.root = root
+        self.source = source
+        self.max_points = max_points
+        self.logger = logging.getLogger('BotLogger')
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock(self, symbol, interval):
+        with self._locks_lock:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _path(self, symbol, interval, column=None):
+        directory = os.path.join(self.root, self.source, re.sub(r'[^A-Za-z0-9_.-]', '_', symbol), interval)
+        return directory if column is None else os.path.join(directory, f"{column}.bin")
+
+    def count(self, symbol, interval):
+        try:
+            return os.path.getsize(self._path(symbol, interval, 'time')) // np.dtype(np.int64).itemsize
+        except OSError:
+            return 0
+
+    def last_timestamp(self, symbol, interval):
+        n = self.count(symbol, interval)
+        if not n:
+            return None
+        with open(self._path(symbol, interval, 'time'), 'rb') as f:
+            f.seek((n - 1) * np.dtype(np.int64).itemsize)
+            return int(np.frombuffer(f.read(np.dtype(np.int64).itemsize), dtype=np.int64)[0])
+
+    def append(self, symbol, interval, rows, now=None, complete=False):
+        step = interval_seconds(interval)
+        now = int(time.time()) if now is None else int(now)
+        with self._lock(symbol, interval):
+            last = self.last_timestamp(symbol, interval)
+            rows = sorted({row[0]: row for row in rows if row[0] + step <= now and (last is None or row[0] > last)}.values())
+            if last is not None and not complete:
+                # Aralığın tamamı borsadan okunmadıkça yalnızca son mumun ardından kesintisiz gelen satırlar yazılır
+                contiguous = next((i for i, row in enumerate(rows) if row[0] != last + (i + 1) * step), len(rows))
+                if contiguous < len(rows):
+                    self.logger.debug(f"[candle_archive.py:CandleArchive.append] {symbol} {interval} arşivinde boşluk oluşturacak {len(rows) - contiguous} mum yazılmadı")
+                rows = rows[:contiguous]
+            if not rows:
+                return 0
+            directory = self._path(symbol, interval)
+            os.makedirs(directory, exist_ok=True)
+            n = self.count(symbol, interval)
+            columns = list(zip(*rows))
+            # Zaman sütunu en son yazılır; yarıda kalan bir yazma sonraki eklemede diğer sütunlardan kırpılır
+            for index, (name, dtype) in enumerate(ARCHIVE_COLUMNS[1:], start=1):
+                with open(self._path(symbol, interval, name), 'ab') as f:
+                    f.truncate(n * np.dtype(dtype).itemsize)
+                    f.write(np.asarray(columns[index], dtype=dtype).tobytes())
+            with open(self._path(symbol, interval, 'time'), 'ab') as f:
+                f.write(np.asarray(columns[0], dtype=np.int64).tobytes())
+            return len(rows)
+
+    def read(self, symbol, interval, start=None, end=None):
+        n = self.count(symbol, interval)
+        if not n:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in ARCHIVE_COLUMNS}
+        timestamps = np.memmap(self._path(symbol, interval, 'time'), dtype=np.int64, mode='r', shape=(n,))
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = n if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        data = {'time': timestamps[lo:hi]}
+        for name, dtype in ARCHIVE_COLUMNS[1:]:
+            data[name] = np.memmap(self._path(symbol, interval, name), dtype=dtype, mode='r', shape=(n,))[lo:hi]
+        return data
+
+    def tail(self, symbol, interval, count, end=None):
+        n = self.count(symbol, interval)
+        if not n:
+            return self.read(symbol, interval)
+        timestamps = np.memmap(self._path(symbol, interval, 'time'), dtype=np.int64, mode='r', shape=(n,))
+        hi = n if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        if not hi:
+            return self.read(symbol, interval, end=-1)
+        return self.read(symbol, interval, start=int(timestamps[max(hi - count, 0)]), end=int(timestamps[hi - 1]))
+
+    @staticmethod
+    def to_rows(data):
+        return list(zip(*(data[name].tolist() for name, _ in ARCHIVE_COLUMNS)))
+
+    def sync(self, symbol, interval, fetch, start=None, now=None):
+        step = interval_seconds(interval)
+        now = int(time.time()) if now is None else int(now)
+        last = self.last_timestamp(symbol, interval)
+        if last is not None:
+            start = last + step
+        elif start is None:
+            start = now - self.max_points * step
+        start -= start % step
+        added = 0
+        while start + step <= now:
+            end = min(start + (self.max_points - 1) * step, now)
+            rows = fetch(symbol, interval, start=start, end=end)
+            added += self.append(symbol, interval, rows or [], now=now, complete=True)
+            start = end + step
+        if added:
+            self.logger.info(f"Mum arşivi güncellendi: {self.source} {symbol} {interval}, {added} yeni mum")
+        return added
@@ -0,0 +1,64 @@
+import threading
+import logging
+from candle_sync import interval_seconds
+
+
+class CandleScheduler:
+    def __init__(self, clock, server_time=None, resync_interval=3600, max_offset=300):
+        self.clock = clock
+        self.server_time = server_time
+        self.resync_interval = resync_interval
+        self.max_offset = max_offset
+        self.logger = logging.getLogger('BotLogger')
+        self.offset = 0.0
+        self.round_trip = None
+        self.synced_at = None
+        self.fired = {}
+        self._lock = threading.Lock()
+
+    def sync(self):
+        if self.server_time is None:
+            return self.offset
+        try:
+            sent = self.clock.time()
+            server = float(self.server_time())
+            received = self.clock.time()
+            offset = server - (sent + received) / 2
+            if abs(offset) > self.max_offset:
+                self.logger.warning(f"[candle_scheduler.py:CandleScheduler.sync] Sunucu saat farkı çok büyük ({offset:.3f} sn), yok sayıldı")
+                return self.offset
+            self.offset = offset
+            self.round_trip = received - sent
+            self.logger.info(f"Sunucu saat farkı: {offset * 1000:.1f} ms (gidiş-dönüş {self.round_trip * 1000:.1f} ms)")
+        except Exception as e:
+            self.logger.error(f"[candle_scheduler.py:CandleScheduler.sync] Sunucu saati alınamadı: {e}")
+        finally:
+            self.synced_at = self.clock.time()
+        return self.offset
+
+    def server_now(self):
+        if self.server_time is not None and (self.synced_at is None or self.clock.time() - self.synced_at >= self.resync_interval):
+            self.sync()
+        return self.clock.time() + self.offset
+
+    def candle_index(self, interval):
+        return int(self.server_now() // interval_seconds(interval))
+
+    def seconds_to_close(self, interval):
+        step = interval_seconds(interval)
+        return step - self.server_now() % step
+
+    def reset(self, interval=None):
+        with self._lock:
+            if interval is None:
+                self.fired.clear()
+            else:
+                self.fired.pop(interval, None)
+
+    def due(self, interval):
+        candle = self.candle_index(interval)
+        with self._lock:
+            last = self.fired.get(interval)
+            self.fired[interval] = candle
+            # İlk çağrı yalnızca mevcut mumu kaydeder; tetikleme bir sonraki kapanışta olur
+            return last is not None and candle > last
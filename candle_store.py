@@ -0,0 +1,120 @@
+import threading
+import numpy as np
+
+
+class CandleBuffer:
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        # Her kayıt hem i hem i + capacity konumuna yazılır; böylece son
+        # `size` mum her zaman bitişik bir dilimdir ve kopyasız verilebilir.
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(self.COLUMNS), 2 * capacity), dtype=np.float64)
+        self._next = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def last_timestamp(self):
+        if not self.size:
+            return None
+        return int(self._ts[(self._next - 1) % self.capacity])
+
+    def _write(self, idx, t, row):
+        self._ts[idx] = t
+        self._ts[idx + self.capacity] = t
+        self._values[:, idx] = row
+        self._values[:, idx + self.capacity] = row
+
+    def _merge(self, t, row):
+        last = self.last_timestamp
+        if last is None or t > last:
+            self._write(self._next, t, row)
+            self._next = (self._next + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        elif t == last:
+            self._write((self._next - 1) % self.capacity, t, row)
+        else:
+            ts = self.timestamps()
+            pos = int(np.searchsorted(ts, t))
+            if pos < self.size and ts[pos] == t:
+                self._write((self._next - self.size + pos) % self.capacity, t, row)
+            else:
+                return False
+        return True
+
+    def _insert(self, rows):
+        # Akıştan gelen yeni mumların gerisinde kalan REST satırları araya yerleştirilir
+        begin, end = self._span()
+        merged = {int(t): tuple(self._values[:, i]) for i, t in zip(range(begin, end), self._ts[begin:end])}
+        merged.update(rows)
+        self._next = 0
+        self.size = 0
+        for t in sorted(merged)[-self.capacity:]:
+            self._merge(t, merged[t])
+
+    def merge(self, t, o, h, l, c, v):
+        with self.lock:
+            self._merge(t, (o, h, l, c, v))
+
+    def merge_rows(self, rows):
+        with self.lock:
+            missed = [(t, (o, h, l, c, v)) for t, o, h, l, c, v in rows if not self._merge(t, (o, h, l, c, v))]
+            if missed:
+                self._insert(missed)
+
+    def clear(self):
+        with self.lock:
+            self._next = 0
+            self.size = 0
+
+    def _span(self):
+        end = self._next + self.capacity
+        return end - self.size, end
+
+    def _view(self, view):
+        view.flags.writeable = False
+        return view
+
+    def timestamps(self):
+        begin, end = self._span()
+        return self._view(self._ts[begin:end])
+
+    def column(self, name):
+        begin, end = self._span()
+        return self._view(self._values[self.COLUMNS.index(name), begin:end])
+
+    def closes(self):
+        return self.column('close')
+
+    def series(self, *names):
+        # Zaman damgaları ve sütunlar aynı kilit altında kopyalanır; eşzamanlı merge hizayı bozamaz
+        with self.lock:
+            begin, end = self._span()
+            return (self._ts[begin:end].copy(),) + tuple(self._values[self.COLUMNS.index(name), begin:end].copy() for name in names)
+
+    def last(self, name='close'):
+        return float(self._values[self.COLUMNS.index(name), (self._next - 1) % self.capacity])
+
+
+class CandleStore:
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(key, CandleBuffer(self.capacity))
+        return buffer
+
+    def drop(self, symbol, timeframe):
+        with self._lock:
+            self._buffers.pop((symbol, timeframe), None)
@@ -0,0 +1,61 @@
+import threading
+import time
+import logging
+
+INTERVAL_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def interval_seconds(interval):
+    try:
+        return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+    except (KeyError, ValueError):
+        raise ValueError(f"Geçersiz zaman aralığı: {interval}")
+
+
+class CandleSync:
+    def __init__(self, fetch, max_points=2000):
+        self.fetch = fetch
+        self.max_points = max_points
+        self.logger = logging.getLogger('BotLogger')
+        self.last_timestamps = {}
+        self._lock = threading.Lock()
+
+    def reset(self, symbol=None, interval=None):
+        with self._lock:
+            if symbol is None:
+                self.last_timestamps.clear()
+            else:
+                self.last_timestamps.pop((symbol, interval), None)
+
+    def prime(self, symbol, interval, timestamp):
+        with self._lock:
+            self.last_timestamps[(symbol, interval)] = timestamp
+
+    def primed(self, symbol, interval):
+        return (symbol, interval) in self.last_timestamps
+
+    def sync(self, symbol, interval, limit=100, now=None):
+        key = (symbol, interval)
+        step = interval_seconds(interval)
+        now = int(time.time()) if now is None else int(now)
+        last = self.last_timestamps.get(key)
+        if last is None or (now - last) // step >= min(limit, self.max_points):
+            rows = self.fetch(symbol, interval, limit=limit)
+            prev = None
+        else:
+            rows = self.fetch(symbol, interval, start=last)
+            prev = last - step
+        if not rows:
+            return rows
+        backfill = []
+        for t, *_ in rows:
+            if prev is not None and t - prev > step:
+                self.logger.warning(f"[candle_sync.py:CandleSync.sync] Mum boşluğu tespit edildi: {symbol} {interval} {prev + step} - {t - step}")
+                backfill.extend(self.fetch(symbol, interval, start=prev + step, end=t - step))
+            prev = t
+        if backfill:
+            rows = sorted(list(rows) + list(backfill), key=lambda row: row[0])
+        with self._lock:
+            if rows[-1][0] > self.last_timestamps.get(key, 0):
+                self.last_timestamps[key] = rows[-1][0]
+        return rows
@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+import logging
+
+
+# Açık pozisyonları kapatan ve koruyan uçlar piyasa verisi devresinden etkilenmez
+ORDER_ENDPOINTS = frozenset({
+    'create_futures_order', 'get_position', 'update_position_leverage',
+    'create_price_triggered_order', 'get_price_triggered_order', 'list_price_triggered_orders', 'cancel_price_triggered_order',
+})
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, base_delay=1.0, max_delay=60.0, jitter=0.2):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.logger = logging.getLogger('BotLogger')
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.retry_at:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.logger.info(f"[circuit_breaker.py:CircuitBreaker] {self.name} devresi kapandı, bağlantı yeniden sağlandı")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                delay = min(self.base_delay * (2 ** self.opened), self.max_delay)
+                delay *= 1 + random.uniform(-self.jitter, self.jitter)
+                self.retry_at = time.monotonic() + delay
+                self.opened += 1
+                self._probing = False
+                if self.state != self.OPEN:
+                    self.logger.warning(f"[circuit_breaker.py:CircuitBreaker] {self.name} devresi açıldı, {delay:.1f} saniye istek gönderilmeyecek")
+                self.state = self.OPEN
+
+    def seconds_until_retry(self):
+        return max(0.0, self.retry_at - time.monotonic()) if self.state == self.OPEN else 0.0
+
+
+class GuardedApi:
+    def __init__(self, api, breaker, metrics=None, ungated=ORDER_ENDPOINTS):
+        self._api = api
+        self._breaker = breaker
+        self._metrics = metrics
+        self._ungated = ungated
+
+    def __getattr__(self, name):
+        attr = getattr(self._api, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        gated = name not in self._ungated
+
+        def call(*args, **kwargs):
+            if gated and not self._breaker.allow():
+                raise CircuitOpenError(f"{self._breaker.name} devresi açık, {name} çağrısı atlandı ({self._breaker.seconds_until_retry():.1f} sn)")
+            started = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception as e:
+                if self._metrics:
+                    self._metrics.observe("exchange_request", time.perf_counter() - started, endpoint=name)
+                    self._metrics.increment("exchange_errors", endpoint=name, status=getattr(e, 'status', None) or "none")
+                status = getattr(e, 'status', None)
+                if gated and isinstance(status, int) and 400 <= status < 500 and status != 429:
+                    self._breaker.record_success()
+                elif gated:
+                    self._breaker.record_failure()
+                raise
+            if self._metrics:
+                self._metrics.observe("exchange_request", time.perf_counter() - started, endpoint=name)
+            if gated:
+                self._breaker.record_success()
+            return result
+        return call
+
+
+class ErrorDigest:
+    def __init__(self, window=300):
+        self.window = window
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def record(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._errors.get(key)
+            if entry is None:
+                self._errors[key] = {'since': now, 'suppressed': 0}
+                return True
+            entry['suppressed'] += 1
+            return False
+
+    def due(self):
+        now = time.monotonic()
+        messages = []
+        with self._lock:
+            for key, entry in list(self._errors.items()):
+                if now - entry['since'] < self.window:
+                    continue
+                if entry['suppressed']:
+                    source = key[0] if isinstance(key, tuple) else key
+                    messages.append(f"{source} son {self.window // 60:.0f} dakikada {entry['suppressed'] + 1} kez başarısız oldu")
+                del self._errors[key]
+        return messages
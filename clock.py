@@ -0,0 +1,39 @@
+import threading
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class SimulatedClock:
+    def __init__(self, start):
+        self._now = float(start)
+        self._cond = threading.Condition()
+
+    def time(self):
+        return self._now
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
+
+    def advance(self, seconds):
+        self.set(self._now + seconds)
+
+    def set(self, timestamp):
+        with self._cond:
+            self._now = max(self._now, float(timestamp))
+            self._cond.notify_all()
+
+    def sleep(self, seconds):
+        target = self._now + seconds
+        with self._cond:
+            self._cond.wait_for(lambda: self._now >= target)
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+import logging
+from datetime import datetime
+
+CACHE_FILES = {'gateio': "coinlist.json", 'binance': "coinlist_binance.json"}
+
+
+def gate_contract_specs(contracts):
+    return {
+        contract.name: {
+            'quanto_multiplier': float(contract.quanto_multiplier or 0),
+            'order_size_min': int(contract.order_size_min or 0),
+            'order_size_max': int(contract.order_size_max or 0),
+            'leverage_min': float(contract.leverage_min or 0),
+            'leverage_max': float(contract.leverage_max or 0),
+            'order_price_round': contract.order_price_round,
+            'in_delisting': bool(contract.in_delisting),
+        }
+        for contract in contracts
+    }
+
+
+class ContractRegistry:
+    def __init__(self, fetch_contracts, cache_file="coinlist.json", ttl=3600, miss_refresh_interval=60):
+        self.fetch_contracts = fetch_contracts
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self.logger = logging.getLogger('BotLogger')
+        self.contracts = {}
+        self.updated_at = 0
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._refresh_lock = threading.Lock()
+
+    def load(self):
+        if not self.cache_file:
+            return False
+        try:
+            mtime = os.path.getmtime(self.cache_file)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            contracts = data.get('contracts') or {name: {} for name in data.get('coins', [])}
+            with self._lock:
+                if data.get('updated_at', 0) >= self.updated_at or not self.contracts:
+                    self.contracts = contracts
+                    self.updated_at = data.get('updated_at', 0)
+                self._mtime = mtime
+            return True
+        except Exception as e:
+            self.logger.error(f"[contract_registry.py:ContractRegistry.load] {self.cache_file} okunamadı: {e}")
+            return False
+
+    def save(self):
+        if not self.cache_file:
+            return
+        try:
+            with self._lock:
+                data = {
+                    'date': datetime.fromtimestamp(self.updated_at).strftime("%Y-%m-%d"),
+                    'updated_at': self.updated_at,
+                    'coins': list(self.contracts),
+                    'contracts': self.contracts,
+                }
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+            self._mtime = os.path.getmtime(self.cache_file)
+        except Exception as e:
+            self.logger.error(f"[contract_registry.py:ContractRegistry.save] {self.cache_file} yazılamadı: {e}")
+
+    def refresh(self):
+        contracts = self.fetch_contracts()
+        with self._lock:
+            self.contracts = contracts
+            self.updated_at = time.time()
+        self.save()
+        self.logger.info(f"Kontrat listesi yenilendi: {len(contracts)} kontrat")
+        return contracts
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.logger.error(f"[contract_registry.py:ContractRegistry._refresh_in_background] Kontrat listesi yenilenemedi: {e}")
+
+    def is_stale(self):
+        return time.time() - self.updated_at > self.ttl
+
+    def ensure_fresh(self):
+        self.load()
+        if not self.contracts:
+            with self._refresh_lock:
+                if not self.contracts:
+                    self.refresh()
+        elif self.is_stale() and (self._refresh_thread is None or not self._refresh_thread.is_alive()):
+            self._refresh_thread = threading.Thread(target=self._refresh_in_background, name="ContractRegistry", daemon=True)
+            self._refresh_thread.start()
+
+    def exists(self, name):
+        self.ensure_fresh()
+        if name in self.contracts:
+            return True
+        if time.time() - self.updated_at > self.miss_refresh_interval:
+            self.refresh()
+        return name in self.contracts
+
+    def get(self, name):
+        self.ensure_fresh()
+        return self.contracts.get(name)
+
+    def names(self, suffix=None):
+        self.ensure_fresh()
+        return sorted(name for name in self.contracts if suffix is None or name.endswith(suffix))
@@ -0,0 +1,60 @@
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+import os
+import signal
+import threading
+import logging
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Botu arayüz ve ses olmadan arka planda çalıştırır")
+    parser.add_argument("--startup-budget", type=float, default=float(os.getenv("STARTUP_BUDGET", "5")),
+                        help="İlk karara kadar izin verilen soğuk başlangıç süresi (saniye)")
+    parser.add_argument("--console", action="store_true", help="Logları konsola da yaz")
+    args = parser.parse_args(argv)
+
+    from logic import BotLogic
+    from trading_engine import TradingEngine
+    imported = time.perf_counter()
+
+    logic = BotLogic(audio=False)
+    if args.console:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+        logic.logger.addHandler(handler)
+    initialized = time.perf_counter()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+
+    engine = TradingEngine(logic)
+    engine.start()
+    engine.start_bot()
+    if engine.first_cycle.wait(timeout=max(args.startup_budget * 4, 60)):
+        first_decision = time.perf_counter() - STARTED
+        message = (
+            f"Soğuk başlangıç: ilk karar {first_decision:.2f} saniye "
+            f"(importlar {imported - STARTED:.2f}, başlatma {initialized - imported:.2f}, hedef {args.startup_budget:.2f})"
+        )
+        if first_decision > args.startup_budget:
+            logic.logger.warning(f"[daemon.py:main] {message} - hedef aşıldı")
+        else:
+            logic.logger.info(message)
+    else:
+        logic.logger.error("[daemon.py:main] İlk işlem döngüsü zamanında tamamlanamadı")
+
+    while not stop.wait(1):
+        pass
+    logic.logger.info("Kapatma sinyali alındı, bot durduruluyor")
+    engine.stop_bot()
+    engine.stop(timeout=30)
+    if logic.notifier:
+        logic.notifier.stop()
+
+
+if __name__ == "__main__":
+    main()
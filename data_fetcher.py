@@ -5,6 +5,11 @@ import logging
 import os
 from dotenv import load_dotenv
 import ta
+from candle_store import CandleStore
+from candle_sync import CandleSync, interval_seconds
+from candle_archive import CandleArchive
+from http_transport import shared_transport
+import time
 
 load_dotenv()
 
@@ -14,29 +19,47 @@ class DataFetcher:
         self.logger = logging.getLogger('BotLogger')
         if self.data_source == "gateio":
             self.config = Configuration(key=os.getenv('GATE_API_KEY'), secret=os.getenv('GATE_API_SECRET'))
-            self.client = SpotApi(ApiClient(self.config))
+            self.client = SpotApi(shared_transport().attach(ApiClient(self.config)))
         elif self.data_source == "binance":
             self.client = BinanceClient(os.getenv('BINANCE_API_KEY'), os.getenv('BINANCE_API_SECRET'))
+            shared_transport().mount(self.client.session)
         else:
             raise ValueError(f"Geçersiz veri kaynağı: {self.data_source}")
+        self.candle_store = CandleStore(capacity=100)
+        self.candle_sync = CandleSync(self.fetch_candle_rows, max_points=1000)
+        self.candle_archive = CandleArchive(os.getenv("CANDLE_ARCHIVE_DIR", "candle_archive"), source=f"{self.data_source}_spot", max_points=1000)
+
+    def fetch_candle_rows(self, symbol, interval, limit=None, start=None, end=None):
+        if self.data_source == "gateio":
+            symbol = symbol.replace("_USDT", "_usdt")
+            klines = self.client.list_candlesticks(symbol, interval=interval, limit=limit, _from=start, to=end)
+            return [(int(k[0]), float(k[5]), float(k[3]), float(k[4]), float(k[2]), float(k[1])) for k in klines]
+        symbol = symbol.replace("_USDT", "USDT")
+        params = {'symbol': symbol, 'interval': interval}
+        if start is not None:
+            params['startTime'] = start * 1000
+        if end is not None:
+            params['endTime'] = end * 1000
+        if limit is not None:
+            params['limit'] = limit
+        klines = self.client.get_klines(**params)
+        return [(int(k[0]) // 1000, float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])) for k in klines]
 
     def fetch_klines(self, symbol, interval="15m", limit=100):
         try:
-            if self.data_source == "gateio":
-                symbol = symbol.replace("_USDT", "_usdt")
-                klines = self.client.list_candlesticks(symbol, interval=interval, limit=limit)
-                df = pd.DataFrame(klines, columns=['time', 'volume', 'close', 'high', 'low', 'open', 'amount'])
-                df['time'] = pd.to_datetime(df['time'], unit='s')
-                df[['volume', 'close', 'high', 'low', 'open']] = df[['volume', 'close', 'high', 'low', 'open']].astype(float)
-            elif self.data_source == "binance":
-                symbol = symbol.replace("_USDT", "USDT")
-                klines = self.client.get_klines(symbol=symbol, interval=interval, limit=limit)
-                df = pd.DataFrame(klines, columns=[
-                    'time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
-                    'quote_asset_volume', 'number_of_trades', 'taker_buy_base', 'taker_buy_quote', 'ignore'
-                ])
-                df['time'] = pd.to_datetime(df['time'], unit='ms')
-                df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+            candles = self.candle_store.get(symbol, interval)
+            if not len(candles):
+                self.candle_sync.reset(symbol, interval)
+                self.candle_archive.sync(symbol, interval, self.fetch_candle_rows, start=int(time.time()) - limit * interval_seconds(interval))
+                archived = self.candle_archive.tail(symbol, interval, limit)
+                if len(archived['time']):
+                    candles.merge_rows(CandleArchive.to_rows(archived))
+                    self.candle_sync.prime(symbol, interval, int(archived['time'][-1]))
+            rows = self.candle_sync.sync(symbol, interval, limit=limit)
+            candles.merge_rows(rows)
+            timestamps, *columns = candles.series(*candles.COLUMNS)
+            df = pd.DataFrame(dict(zip(candles.COLUMNS, columns)))
+            df.insert(0, 'time', pd.to_datetime(timestamps, unit='s'))
             return df
         except Exception as e:
             self.logger.error(f"[data_fetcher.py:DataFetcher.fetch_klines] Klines alınamadı: {e}")
@@ -0,0 +1,407 @@
+import itertools
+import random
+import threading
+import time
+import logging
+from types import SimpleNamespace
+import numpy as np
+from candle_sync import interval_seconds
+
+
+class SimulatedApiError(Exception):
+    def __init__(self, status=500, reason="Internal Server Error", label="SERVER_ERROR", message=""):
+        self.status = status
+        self.reason = reason
+        self.label = label
+        self.body = f'{{"label": "{label}", "message": "{message}"}}'
+        super().__init__(f"({status}) {reason}: {label} {message}".strip())
+
+
+class SimulatedFuturesApi:
+    def __init__(self, balance=1000.0, market=None, clock=None, sleep=None, latency=0.0, latency_jitter=0.0,
+                 error_rate=0.0, error_statuses=(500, 502, 429), fee_rate=0.0005, slippage=0.0, max_fill_size=None, seed=None):
+        self.market = market
+        self.clock = clock or time.time
+        self.sleep = sleep or time.sleep
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.max_fill_size = max_fill_size
+        self.logger = logging.getLogger('BotLogger')
+        self.cash = float(balance)
+        self.contracts = {}
+        self.candles = {}
+        self.prices = {}
+        self.positions = {}
+        self.fills = []
+        self.triggers = {}
+        self.calls = {}
+        self._failures = {}
+        self._order_ids = itertools.count(1)
+        self._trigger_ids = itertools.count(1)
+        self._triggers_checked = {}
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+    def add_contract(self, name, quanto_multiplier=1.0, leverage_min=1, leverage_max=100, order_size_min=1, order_size_max=1000000, order_price_round="0.00001"):
+        self.contracts[name] = {
+            'quanto_multiplier': quanto_multiplier,
+            'leverage_min': leverage_min,
+            'leverage_max': leverage_max,
+            'order_size_min': order_size_min,
+            'order_size_max': order_size_max,
+            'order_price_round': order_price_round,
+        }
+
+    def load_candles(self, contract, interval, rows):
+        if contract not in self.contracts:
+            self.add_contract(contract)
+        rows = sorted(rows)
+        self.candles[(contract, interval)] = np.array([row[:6] for row in rows], dtype=np.float64).reshape(-1, 6)
+
+    def load_archive(self, archive, symbols, interval='15m', start=None, end=None):
+        for symbol in symbols:
+            data = archive.read(symbol, interval, start, end)
+            self.load_candles(symbol, interval, archive.to_rows(data))
+
+    def set_price(self, contract, last, mark_price=None):
+        if contract not in self.contracts:
+            self.add_contract(contract)
+        self.prices[contract] = (float(last), float(mark_price if mark_price is not None else last))
+
+    def fail_next(self, method, status=500, count=1):
+        self._failures[method] = [status, count]
+
+    def _call(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency or self.latency_jitter:
+            self.sleep(self.latency + self._random.uniform(0, self.latency_jitter))
+        forced = self._failures.get(method)
+        if self.triggers:
+            self.process_triggers()
+        if forced:
+            forced[1] -= 1
+            if forced[1] <= 0:
+                del self._failures[method]
+            raise SimulatedApiError(forced[0], "Injected Error", "INJECTED_ERROR", method)
+        if self.error_rate and self._random.random() < self.error_rate:
+            status = self._random.choice(self.error_statuses)
+            raise SimulatedApiError(status, "Injected Error", "TOO_MANY_REQUESTS" if status == 429 else "SERVER_ERROR", method)
+
+    def _contract(self, contract):
+        spec = self.contracts.get(contract)
+        if spec is None and self.market is not None:
+            remote = self.market.get_futures_contract("usdt", contract)
+            self.add_contract(contract, float(remote.quanto_multiplier or 1), float(remote.leverage_min or 1), float(remote.leverage_max or 100),
+                              int(remote.order_size_min or 1), int(remote.order_size_max or 1000000), remote.order_price_round)
+            spec = self.contracts[contract]
+        if spec is None:
+            raise SimulatedApiError(400, "Bad Request", "CONTRACT_NOT_FOUND", contract)
+        return spec
+
+    def _series(self, contract):
+        for (name, interval), data in self.candles.items():
+            if name == contract and len(data):
+                return interval_seconds(interval), data
+        return None, None
+
+    def _partial_candle(self, candle, step, now):
+        t, o, h, l, c, v = candle
+        fraction = min(max((now - t) / step, 0.0), 1.0)
+        if fraction >= 1.0:
+            return candle
+        # Mum içi fiyat yolu: yükselen mumda açılış→dip→tepe→kapanış, düşen mumda açılış→tepe→dip→kapanış
+        path = (o, l, h, c) if c >= o else (o, h, l, c)
+        position = fraction * 3
+        segment = min(int(position), 2)
+        price = path[segment] + (path[segment + 1] - path[segment]) * (position - segment)
+        seen = path[:segment + 1] + (price,)
+        return np.array([t, o, max(seen), min(seen), price, v * fraction])
+
+    def price_at(self, contract, now=None):
+        if contract in self.prices:
+            return self.prices[contract][0]
+        if self.market is not None:
+            tickers = self.market.list_futures_tickers("usdt", contract=contract)
+            return float(tickers[0].last)
+        now = self.clock() if now is None else now
+        step, data = self._series(contract)
+        if data is None:
+            raise SimulatedApiError(400, "Bad Request", "CONTRACT_NOT_FOUND", contract)
+        idx = int(np.searchsorted(data[:, 0], now, side='right')) - 1
+        if idx < 0:
+            return float(data[0, 1])
+        return float(self._partial_candle(data[idx], step, now)[4])
+
+    def _first_cross(self, contract, start, end, rule, trigger_price):
+        hit = (lambda price: price >= trigger_price) if rule == 1 else (lambda price: price <= trigger_price)
+        step, data = self._series(contract)
+        if contract in self.prices or self.market is not None or data is None:
+            price = self.price_at(contract, end)
+            return (end, price) if hit(price) else None
+        lo = max(int(np.searchsorted(data[:, 0], start, side='right')) - 1, 0)
+        hi = int(np.searchsorted(data[:, 0], end, side='right'))
+        for t, o, h, l, c, _ in data[lo:hi]:
+            path = (o, l, h, c) if c >= o else (o, h, l, c)
+            points = [(t + k * step / 3, price) for k, price in enumerate(path)]
+            for (t0, p0), (t1, p1) in zip(points, points[1:]):
+                if t1 <= start or t0 > end:
+                    continue
+                a, b = max(t0, start), min(t1, end)
+                pa = p0 + (p1 - p0) * (a - t0) / (t1 - t0)
+                pb = p0 + (p1 - p0) * (b - t0) / (t1 - t0)
+                if hit(pa):
+                    return a, pa
+                if hit(pb):
+                    return a + (b - a) * (trigger_price - pa) / (pb - pa), trigger_price
+        return None
+
+    def process_triggers(self):
+        with self._lock:
+            now = self.clock()
+            for trigger in sorted(self.triggers.values(), key=lambda trigger: trigger['id']):
+                if trigger['status'] != 'open':
+                    continue
+                start = self._triggers_checked.get(trigger['id'], trigger['create_time'])
+                self._triggers_checked[trigger['id']] = now
+                cross = self._first_cross(trigger['contract'], start, now, trigger['rule'], trigger['price'])
+                if cross is None:
+                    continue
+                fired_at, price = cross
+                position = self._position(trigger['contract'])
+                size = trigger['size']
+                if trigger['reduce_only']:
+                    size = int(np.sign(size)) * min(abs(size), abs(position['size'])) if position['size'] and (position['size'] > 0) != (size > 0) else 0
+                trigger.update(status='finished', finish_time=fired_at)
+                if not size:
+                    trigger.update(finish_as='failed', reason='REDUCE_ONLY_NO_POSITION')
+                    continue
+                fill_price = price * (1 + self.slippage) if size > 0 else price * (1 - self.slippage)
+                try:
+                    self._fill(trigger['contract'], size, fill_price)
+                    self.fills[-1]['time'] = fired_at
+                    trigger.update(finish_as='succeeded', trade_id=next(self._order_ids), fill_price=fill_price)
+                except SimulatedApiError as e:
+                    trigger.update(finish_as='failed', reason=e.label)
+
+    def _trigger_view(self, trigger):
+        return SimpleNamespace(
+            id=trigger['id'], user=0, status=trigger['status'], finish_as=trigger['finish_as'], reason=trigger['reason'],
+            trade_id=trigger['trade_id'], create_time=trigger['create_time'], finish_time=trigger['finish_time'],
+            initial=SimpleNamespace(contract=trigger['contract'], size=trigger['size'], price="0", tif='ioc', reduce_only=trigger['reduce_only'], text=trigger['text']),
+            trigger=SimpleNamespace(strategy_type=0, price_type=0, price=str(trigger['price']), rule=trigger['rule']),
+        )
+
+    def _mark_price(self, contract):
+        if contract in self.prices:
+            return self.prices[contract][1]
+        return self.price_at(contract)
+
+    def list_futures_contracts(self, settle, **kwargs):
+        self._call('list_futures_contracts')
+        if self.market is not None:
+            return self.market.list_futures_contracts(settle, **kwargs)
+        return [
+            SimpleNamespace(name=name, quanto_multiplier=str(spec['quanto_multiplier']), leverage_min=str(spec['leverage_min']),
+                            leverage_max=str(spec['leverage_max']), order_size_min=spec['order_size_min'],
+                            order_size_max=spec['order_size_max'], order_price_round=spec['order_price_round'], in_delisting=False)
+            for name, spec in self.contracts.items()
+        ]
+
+    def list_futures_candlesticks(self, settle, contract, interval='5m', limit=None, _from=None, to=None, **kwargs):
+        self._call('list_futures_candlesticks')
+        if self.market is not None:
+            return self.market.list_futures_candlesticks(settle, contract, interval=interval, limit=limit, _from=_from, to=to, **kwargs)
+        data = self.candles.get((contract, interval))
+        if data is None:
+            raise SimulatedApiError(400, "Bad Request", "CONTRACT_NOT_FOUND", f"{contract} {interval}")
+        step = interval_seconds(interval)
+        now = self.clock()
+        end = now if to is None else min(to, now)
+        hi = int(np.searchsorted(data[:, 0], end, side='right'))
+        if _from is not None:
+            lo = int(np.searchsorted(data[:, 0], _from, side='left'))
+            hi = min(hi, lo + 2000)
+        else:
+            lo = max(hi - (limit or 100), 0)
+        candles = [data[i] if i < hi - 1 else self._partial_candle(data[i], step, now) for i in range(lo, hi)]
+        return [SimpleNamespace(t=float(t), o=str(o), h=str(h), l=str(l), c=str(c), v=int(v), sum=str(v * c)) for t, o, h, l, c, v in candles]
+
+    def list_futures_tickers(self, settle, contract=None, **kwargs):
+        self._call('list_futures_tickers')
+        if self.market is not None:
+            return self.market.list_futures_tickers(settle, contract=contract, **kwargs)
+        names = [contract] if contract else list(self.contracts)
+        tickers = []
+        for name in names:
+            try:
+                tickers.append(SimpleNamespace(contract=name, last=str(self.price_at(name)), mark_price=str(self._mark_price(name))))
+            except SimulatedApiError:
+                if contract:
+                    raise
+        return tickers
+
+    def _position(self, contract):
+        position = self.positions.get(contract)
+        if position is None:
+            position = {'size': 0, 'entry_price': 0.0, 'leverage': 10, 'realised_pnl': 0.0}
+            self.positions[contract] = position
+        return position
+
+    def _unrealised(self, contract, position):
+        if not position['size']:
+            return 0.0
+        multiplier = self._contract(contract)['quanto_multiplier']
+        return position['size'] * multiplier * (self._mark_price(contract) - position['entry_price'])
+
+    def _margin(self, contract, position):
+        if not position['size']:
+            return 0.0
+        multiplier = self._contract(contract)['quanto_multiplier']
+        return abs(position['size']) * multiplier * position['entry_price'] / position['leverage']
+
+    def _account(self):
+        unrealised = sum(self._unrealised(contract, position) for contract, position in self.positions.items())
+        margin = sum(self._margin(contract, position) for contract, position in self.positions.items())
+        total = self.cash + unrealised
+        return total, max(total - margin, 0.0), unrealised, margin
+
+    def _position_view(self, contract, position):
+        return SimpleNamespace(
+            contract=contract, size=position['size'], leverage=str(position['leverage']), entry_price=str(position['entry_price']),
+            mark_price=str(self._mark_price(contract) if position['size'] else 0), unrealised_pnl=str(self._unrealised(contract, position)),
+            realised_pnl=str(position['realised_pnl']), margin=str(self._margin(contract, position)), mode='single',
+        )
+
+    def list_futures_accounts(self, settle, **kwargs):
+        self._call('list_futures_accounts')
+        with self._lock:
+            total, available, unrealised, margin = self._account()
+            return SimpleNamespace(total=str(total), available=str(available), unrealised_pnl=str(unrealised), position_margin=str(margin), currency=settle.upper())
+
+    def update_position_leverage(self, settle, contract, leverage, **kwargs):
+        self._call('update_position_leverage')
+        with self._lock:
+            spec = self._contract(contract)
+            leverage = int(float(leverage))
+            if not spec['leverage_min'] <= leverage <= spec['leverage_max']:
+                raise SimulatedApiError(400, "Bad Request", "LEVERAGE_OUT_OF_RANGE", str(leverage))
+            position = self._position(contract)
+            position['leverage'] = leverage
+            return self._position_view(contract, position)
+
+    def get_position(self, settle, contract, **kwargs):
+        self._call('get_position')
+        with self._lock:
+            self._contract(contract)
+            return self._position_view(contract, self._position(contract))
+
+    def list_positions(self, settle, **kwargs):
+        self._call('list_positions')
+        with self._lock:
+            return [self._position_view(contract, position) for contract, position in self.positions.items() if position['size']]
+
+    def create_futures_order(self, settle, futures_order, **kwargs):
+        self._call('create_futures_order')
+        with self._lock:
+            contract = futures_order.contract
+            spec = self._contract(contract)
+            size = int(futures_order.size)
+            tif = getattr(futures_order, 'tif', 'gtc')
+            limit_price = float(getattr(futures_order, 'price', 0) or 0)
+            if limit_price and tif != 'ioc':
+                raise SimulatedApiError(400, "Bad Request", "INVALID_PARAM_VALUE", "Simülatör yalnızca IOC emirlerini eşler")
+            if not size or not spec['order_size_min'] <= abs(size) <= spec['order_size_max']:
+                raise SimulatedApiError(400, "Bad Request", "ORDER_SIZE_OUT_OF_RANGE", str(size))
+
+            last = self.price_at(contract)
+            fill_price = last * (1 + self.slippage) if size > 0 else last * (1 - self.slippage)
+            crosses = not limit_price or (fill_price <= limit_price if size > 0 else fill_price >= limit_price)
+            filled = 0
+            if crosses:
+                filled = size if self.max_fill_size is None else int(np.sign(size)) * min(abs(size), self.max_fill_size)
+                self._fill(contract, filled, fill_price)
+            now = self.clock()
+            return SimpleNamespace(
+                id=next(self._order_ids), contract=contract, size=size, left=size - filled, price=str(limit_price), tif=tif,
+                fill_price=str(fill_price if filled else 0), status='finished', finish_as='filled' if filled == size else 'ioc',
+                create_time=now, finish_time=now, text=getattr(futures_order, 'text', None),
+                is_reduce_only=bool(getattr(futures_order, 'reduce_only', False)), is_close=bool(getattr(futures_order, 'close', False)),
+            )
+
+    def create_price_triggered_order(self, settle, futures_price_triggered_order, **kwargs):
+        self._call('create_price_triggered_order')
+        with self._lock:
+            initial = futures_price_triggered_order.initial
+            trigger = futures_price_triggered_order.trigger
+            self._contract(initial.contract)
+            rule = int(trigger.rule)
+            if rule not in (1, 2):
+                raise SimulatedApiError(400, "Bad Request", "INVALID_PARAM_VALUE", f"rule {rule}")
+            size = int(initial.size or 0)
+            reduce_only = bool(getattr(initial, 'reduce_only', False))
+            if not size:
+                raise SimulatedApiError(400, "Bad Request", "INVALID_PARAM_VALUE", "Simülatör size=0 (close) tetik emirlerini desteklemiyor")
+            order_id = next(self._trigger_ids)
+            self.triggers[order_id] = {
+                'id': order_id, 'contract': initial.contract, 'size': size, 'reduce_only': reduce_only, 'text': getattr(initial, 'text', None),
+                'rule': rule, 'price': float(trigger.price), 'status': 'open', 'finish_as': None, 'reason': None, 'trade_id': None,
+                'fill_price': None, 'create_time': self.clock(), 'finish_time': None,
+            }
+            return SimpleNamespace(id=order_id)
+
+    def get_price_triggered_order(self, settle, order_id, **kwargs):
+        self._call('get_price_triggered_order')
+        with self._lock:
+            trigger = self.triggers.get(int(order_id))
+            if trigger is None:
+                raise SimulatedApiError(404, "Not Found", "AUTO_ORDER_NOT_FOUND", str(order_id))
+            return self._trigger_view(trigger)
+
+    def list_price_triggered_orders(self, settle, status, contract=None, **kwargs):
+        self._call('list_price_triggered_orders')
+        with self._lock:
+            return [self._trigger_view(trigger) for trigger in self.triggers.values()
+                    if (trigger['status'] == 'open') == (status == 'open') and (contract is None or trigger['contract'] == contract)]
+
+    def cancel_price_triggered_order(self, settle, order_id, **kwargs):
+        self._call('cancel_price_triggered_order')
+        with self._lock:
+            trigger = self.triggers.get(int(order_id))
+            if trigger is None:
+                raise SimulatedApiError(404, "Not Found", "AUTO_ORDER_NOT_FOUND", str(order_id))
+            if trigger['status'] != 'open':
+                raise SimulatedApiError(400, "Bad Request", "AUTO_ORDER_FINISHED", str(order_id))
+            trigger.update(status='finished', finish_as='cancelled', finish_time=self.clock())
+            return self._trigger_view(trigger)
+
+    def _fill(self, contract, size, price):
+        spec = self._contract(contract)
+        multiplier = spec['quanto_multiplier']
+        position = self._position(contract)
+        old = position['size']
+        new = old + size
+        if abs(new) > abs(old):
+            opening = abs(new) - abs(old) if old * new >= 0 else abs(new)
+            _, available, _, _ = self._account()
+            required = opening * multiplier * price / position['leverage'] + abs(size) * multiplier * price * self.fee_rate
+            if required > available:
+                raise SimulatedApiError(400, "Bad Request", "INSUFFICIENT_AVAILABLE", f"{required:.4f} > {available:.4f}")
+        realised = 0.0
+        if old and (old > 0) != (size > 0):
+            closed = min(abs(size), abs(old))
+            realised = closed * multiplier * (price - position['entry_price']) * (1 if old > 0 else -1)
+        if new == 0:
+            position['entry_price'] = 0.0
+        elif old == 0 or (old > 0) != (new > 0):
+            position['entry_price'] = price
+        elif abs(new) > abs(old):
+            position['entry_price'] = (position['entry_price'] * abs(old) + price * abs(size)) / abs(new)
+        fee = abs(size) * multiplier * price * self.fee_rate
+        position['size'] = new
+        position['realised_pnl'] += realised - fee
+        self.cash += realised - fee
+        self.fills.append({'time': self.clock(), 'contract': contract, 'size': size, 'price': price, 'fee': fee, 'realised_pnl': realised})
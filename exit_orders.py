@@ -0,0 +1,82 @@
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+RULE_ABOVE = 1
+RULE_BELOW = 2
+EXIT_LABELS = {'t-tp': 'tp', 't-sl': 'sl'}
+
+
+def round_price(price, order_price_round=None):
+    if not order_price_round:
+        return f"{price:.8g}"
+    step = Decimal(str(order_price_round))
+    return str((Decimal(str(price)) / step).quantize(Decimal(1), rounding=ROUND_HALF_UP) * step)
+
+
+class ExitOrders:
+    def __init__(self, exchange, settle="usdt", price_type=0):
+        self.exchange = exchange
+        self.settle = settle
+        self.price_type = price_type
+        self.logger = logging.getLogger('BotLogger')
+
+    def _create(self, contract, size, price, rule, label, order_price_round=None):
+        from gate_api import FuturesInitialOrder, FuturesPriceTrigger, FuturesPriceTriggeredOrder
+        order = FuturesPriceTriggeredOrder(
+            initial=FuturesInitialOrder(contract=contract, size=size, price="0", tif='ioc', reduce_only=True, text=f"t-{label.lower()}"),
+            trigger=FuturesPriceTrigger(strategy_type=0, price_type=self.price_type, price=round_price(price, order_price_round), rule=rule),
+        )
+        return int(self.exchange.create_price_triggered_order(self.settle, order).id)
+
+    def place(self, contract, position_type, order_size, tp_price, sl_price, order_price_round=None):
+        close_size = -order_size if position_type == 'LONG' else abs(order_size)
+        tp_rule, sl_rule = (RULE_ABOVE, RULE_BELOW) if position_type == 'LONG' else (RULE_BELOW, RULE_ABOVE)
+        orders = {'contract': contract, 'tp': None, 'sl': None, 'tp_price': tp_price, 'sl_price': sl_price}
+        try:
+            orders['tp'] = self._create(contract, close_size, tp_price, tp_rule, "TP", order_price_round)
+            orders['sl'] = self._create(contract, close_size, sl_price, sl_rule, "SL", order_price_round)
+            self.logger.info(f"{position_type} borsa tarafı çıkış emirleri: TP #{orders['tp']} @ {tp_price}, SL #{orders['sl']} @ {sl_price}")
+            return orders
+        except Exception as e:
+            self.logger.error(f"[exit_orders.py:ExitOrders.place] {position_type} TP/SL tetik emirleri verilemedi: {e}")
+            self.cancel(orders)
+            return None
+
+    def cancel(self, orders, keep=None):
+        cancelled = True
+        for label in ('tp', 'sl'):
+            order_id = orders.get(label)
+            if order_id is None or label == keep:
+                continue
+            try:
+                self.exchange.cancel_price_triggered_order(self.settle, str(order_id))
+                orders[label] = None
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                if status == 404:
+                    orders[label] = None
+                    continue
+                cancelled = False
+                if status == 400:
+                    # Emir zaten sonuçlanmış; tetiklenip tetiklenmediği status() ile okunur
+                    continue
+                self.logger.error(f"[exit_orders.py:ExitOrders.cancel] Tetik emri #{order_id} iptal edilemedi: {e}")
+        return cancelled
+
+    def status(self, orders):
+        result = {}
+        for label in ('tp', 'sl'):
+            order_id = orders.get(label)
+            if order_id is None:
+                continue
+            order = self.exchange.get_price_triggered_order(self.settle, str(order_id))
+            result[label] = (order.status, order.finish_as)
+        return result
+
+    def open_orders(self, exclude=()):
+        orders = []
+        for order in self.exchange.list_price_triggered_orders(self.settle, 'open'):
+            label = EXIT_LABELS.get(getattr(order.initial, 'text', None))
+            if label and int(order.id) not in exclude:
+                orders.append({'contract': order.initial.contract, 'tp': None, 'sl': None, label: int(order.id)})
+        return orders
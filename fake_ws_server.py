@@ -0,0 +1,187 @@
+import argparse
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+import time
+import logging
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def load_frames(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def setup(self):
+        self.send_lock = threading.Lock()
+        self.channels = set()
+        self.replaying = False
+        self.closed = False
+
+    def handle(self):
+        if not self._handshake():
+            return
+        self.server.connections += 1
+        try:
+            while not self.closed:
+                frame = self._read_frame()
+                if frame is None:
+                    break
+                opcode, payload = frame
+                if opcode == 0x8:
+                    self._send_frame(0x8, payload[:2])
+                    break
+                if opcode == 0x9:
+                    self._send_frame(0xA, payload)
+                elif opcode == 0x1:
+                    self._on_text(payload.decode('utf-8'))
+        finally:
+            self.closed = True
+
+    def _handshake(self):
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return False
+            data += chunk
+        headers = {}
+        for line in data.decode('latin-1').split('\r\n')[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.request.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    def _recv_exact(self, n):
+        data = b''
+        while len(data) < n:
+            try:
+                chunk = self.request.recv(n - len(data))
+            except OSError:
+                return None
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_frame(self):
+        header = self._recv_exact(2)
+        if header is None:
+            return None
+        opcode = header[0] & 0x0F
+        masked = header[1] & 0x80
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._recv_exact(8))[0]
+        mask = self._recv_exact(4) if masked else None
+        payload = self._recv_exact(length) if length else b''
+        if payload is None:
+            return None
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    def _send_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        with self.send_lock:
+            try:
+                self.request.sendall(header + payload)
+            except OSError:
+                self.closed = True
+
+    def send_text(self, text):
+        self._send_frame(0x1, text.encode('utf-8'))
+
+    def _on_text(self, text):
+        msg = json.loads(text)
+        channel = msg.get('channel')
+        if channel == 'futures.ping':
+            self.send_text(json.dumps({'time': int(time.time()), 'channel': 'futures.pong', 'event': '', 'result': None}))
+            return
+        if msg.get('event') == 'subscribe':
+            self.channels.add(channel)
+            self.send_text(json.dumps({'time': int(time.time()), 'channel': channel, 'event': 'subscribe', 'result': {'status': 'success'}}))
+            if not self.replaying:
+                self.replaying = True
+                threading.Thread(target=self._replay, daemon=True).start()
+
+    def _replay(self):
+        for frame in self.server.frames:
+            if self.closed:
+                return
+            if json.loads(frame).get('channel') in self.channels:
+                self.send_text(frame)
+                if self.server.interval:
+                    time.sleep(self.server.interval)
+        if self.server.close_after_replay and not self.closed:
+            self._send_frame(0x8, struct.pack('>H', 1000))
+            self.closed = True
+            try:
+                self.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class FakeWebSocketServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, frames, host='127.0.0.1', port=0, interval=0.0, close_after_replay=False):
+        super().__init__((host, port), _Handler)
+        self.frames = frames
+        self.interval = interval
+        self.close_after_replay = close_after_replay
+        self.connections = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"ws://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="FakeWebSocketServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kaydedilmiş Gate futures WebSocket mesajlarını yerelde tekrar oynatır")
+    parser.add_argument("frames", help="Her satırda bir JSON mesajı içeren kayıt dosyası")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--close-after-replay", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = FakeWebSocketServer(load_frames(args.frames), args.host, args.port, args.interval, args.close_after_replay)
+    print(f"Sahte WebSocket sunucusu çalışıyor: {server.url}")
+    server.serve_forever()
@@ -0,0 +1,55 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from gate_api import ApiClient, Configuration, FuturesApi, SpotApi
+from http_transport import shared_transport
+
+
+EMPTY_PAYLOAD_HASH = hashlib.sha512(b'').hexdigest()
+
+
+class CustomConfiguration(Configuration):
+    def __init__(self, key, secret):
+        super().__init__(key=key, secret=secret)
+        self.api_key = key
+        self.api_secret = secret.encode('utf-8')
+        # Anahtar bloğu bir kez hazırlanır; her istekte yalnızca kopyalanır
+        self._signer = hmac.new(self.api_secret, digestmod=hashlib.sha512)
+
+    def sign(self, method, url, query_string=None, payload_string=None):
+        t = str(int(time.time()))
+        if payload_string is not None and not isinstance(payload_string, str):
+            payload_string = json.dumps(payload_string)
+        hashed_payload = hashlib.sha512(payload_string.encode('utf-8')).hexdigest() if payload_string else EMPTY_PAYLOAD_HASH
+        s = f'{method}\n{url}\n{query_string or ""}\n{hashed_payload}\n{t}'
+        signer = self._signer.copy()
+        signer.update(s.encode('utf-8'))
+        return {'KEY': self.api_key, 'Timestamp': t, 'SIGN': signer.hexdigest()}
+
+
+class SigningApiClient(ApiClient):
+    # SDK imzayı ApiClient.gen_sign üzerinden üretir; hazırlanmış HMAC bloğu burada devreye girer
+    def gen_sign(self, method, url, query_string=None, body=None):
+        return self.configuration.sign(method, url, query_string, body)
+
+
+_public_spot = None
+_public_lock = threading.Lock()
+
+
+def create_futures_api(key, secret):
+    return FuturesApi(shared_transport().attach(SigningApiClient(CustomConfiguration(key=key, secret=secret))))
+
+
+def public_spot_api():
+    global _public_spot
+    with _public_lock:
+        if _public_spot is None:
+            _public_spot = SpotApi(shared_transport().attach(ApiClient(Configuration())))
+        return _public_spot
+
+
+def fetch_server_time():
+    return public_spot_api().get_system_time().server_time / 1000
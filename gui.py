@@ -5,8 +5,9 @@ try:
 except ImportError:
     notification = None
 from logic import BotLogic
-from datetime import datetime
+from trading_engine import TradingEngine
 import pygame
+import time
 import logging
 
 logging.basicConfig(
@@ -31,9 +32,13 @@ class BotGUI(wx.Frame):
         self.hour_vars = {h: h in self.logic.long_settings['allowed_hours'] for h in range(24)}
         self.coin_list_cache = None
         self.sync_settings = False
+        self.pending_settings = {}
+        self.pending_running = None
+        self.snapshot = None
+        self.engine = TradingEngine(self.logic, on_snapshot=lambda snapshot: wx.CallAfter(self.refresh_ui, snapshot))
         try:
             self._setup_ui()
-            self.refresh_ui()
+            self.refresh_ui(self.logic.snapshot())
             self._start_ui_loop()
             logging.debug("BotGUI initialized")
         except Exception as e:
@@ -41,72 +46,54 @@ class BotGUI(wx.Frame):
             print(f"GUI başlatma hatası: {e}")
             raise
 
-    def refresh_ui(self):
+    def refresh_ui(self, snapshot=None):
+        started = time.perf_counter()
         try:
-            balance_text = f"💵 Bakiye 💵: {self.logic.balance or 0:.2f}"
-            if self.logic.current_long_position or self.logic.current_short_position:
-                balance_text += f" (+{self.logic.position_profit:.2f})"
+            if snapshot is not None:
+                self.snapshot = snapshot
+            snapshot = self.snapshot
+            if snapshot is None:
+                return
+            balance_text = f"💵 Bakiye 💵: {snapshot['balance']:.2f}"
+            if snapshot['has_position']:
+                balance_text += f" (+{snapshot['position_profit']:.2f})"
             self.usdt_balance_label.SetLabel(balance_text)
             self.usdt_balance_label.SetForegroundColour(wx.Colour(0, 255, 0))
             self.usdt_balance_label.SetFont(wx.Font(16, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
-            price = self.logic.last_price or 0
+            price = snapshot['last_price']
             price_format = f"{price:.4f}" if price < 1 else f"{price:.2f}"
-            self.dot_price_label.SetLabel(f"{self.logic.symbol} Fiyatı: {price_format}")
-            self.dot_rsi_label.SetLabel(f"RSI(6): {self.logic.last_rsi or 0:.2f}")
-            self.dot_distance_label.SetLabel(f"MA7'ye Uzaklık: {self.logic.last_ma7_distance or 0:.2f}%")
-            self.son_islem_kar_label.SetLabel(f"Toplam İşlem Kar: {self.logic.last_trade_profit or 0:.2f} USDT")
-            self.btc_label.SetLabel(f"BTC USDT: {self.logic.btc_price or 0:.2f}")
+            self.dot_price_label.SetLabel(f"{snapshot['symbol']} Fiyatı: {price_format}")
+            self.dot_rsi_label.SetLabel(f"RSI(6): {snapshot['last_rsi']:.2f}")
+            self.dot_distance_label.SetLabel(f"MA7'ye Uzaklık: {snapshot['last_ma7_distance']:.2f}%")
+            self.son_islem_kar_label.SetLabel(f"Toplam İşlem Kar: {snapshot['last_trade_profit']:.2f} USDT")
+            self.btc_label.SetLabel(f"BTC USDT: {snapshot['btc_price']:.2f}")
             self.btc_label.SetForegroundColour(wx.Colour(255, 165, 0))
-            self.eth_label.SetLabel(f"ETH / USDT: {self.logic.eth_price or 0:.2f}")
+            self.eth_label.SetLabel(f"ETH / USDT: {snapshot['eth_price']:.2f}")
             self.eth_label.SetForegroundColour(wx.Colour(0, 128, 0))
-            self.mesaj_label.SetLabel(f"Durum: {'Durduruldu' if not self.logic.bot_running else 'Çalışıyor'}")
+            running = snapshot['bot_running'] if self.pending_running is None else self.pending_running
+            self._show_running(running)
+            if not running:
+                self.mesaj_label.SetLabel("Durum: Durduruldu")
+            elif snapshot['mum_sonu_bekle']:
+                self.mesaj_label.SetLabel(f"Mum kapanışı için {snapshot['seconds_to_candle_close']} saniye bekleniyor...")
+            else:
+                self.mesaj_label.SetLabel("Durum: Çalışıyor")
             self._refresh_theme()
             logging.debug("UI refreshed")
         except Exception as e:
             logging.error(f"[gui.py:BotGUI.refresh_ui] UI yenileme hatası: {e}")
             print(f"UI yenileme hatası: {e}")
+        finally:
+            self.logic.metrics.observe("gui_refresh", time.perf_counter() - started)
 
     def _start_ui_loop(self):
         try:
-            self.refresh_ui()
-            if self.logic.bot_running:
-                self._update_data()
-            self.timer = wx.Timer(self)
-            self.Bind(wx.EVT_TIMER, lambda evt: self._start_ui_loop(), self.timer)
-            self.timer.Start(10000)
+            self.engine.start()
             logging.debug("UI loop started")
         except Exception as e:
             logging.error(f"[gui.py:BotGUI._start_ui_loop] UI döngü hatası: {e}")
             print(f"UI döngü hatası: {e}")
 
-    def _update_data(self):
-        try:
-            if self.logic.mum_sonu_bekle:
-                self._check_candle_close()
-            else:
-                self.logic.trade_logic()
-            logging.debug("Data updated")
-        except Exception as e:
-            logging.error(f"[gui.py:BotGUI._update_data] Veri güncelleme hatası: {e}")
-            print(f"Veri güncelleme hatası: {e}")
-
-    def _check_candle_close(self):
-        try:
-            current_time = datetime.now()
-            seconds_to_next_candle = 900 - (current_time.minute % 15 * 60 + current_time.second)
-            if seconds_to_next_candle <= 0:
-                self.mesaj_label.SetLabel("Durum: Çalışıyor")
-                self.logic.trade_logic()
-                wx.CallLater(1000, self._check_candle_close)
-            else:
-                self.mesaj_label.SetLabel(f"Mum kapanışı için {seconds_to_next_candle} saniye bekleniyor...")
-                self.logic.update_data()
-                wx.CallLater(min(seconds_to_next_candle * 1000, 60000), self._check_candle_close)
-            logging.debug("Candle close checked")
-        except Exception as e:
-            logging.error(f"[gui.py:BotGUI._check_candle_close] Mum kapanış hatası: {e}")
-            print(f"Mum kapanış hatası: {e}")
-
     def _refresh_theme(self):
         try:
             for widget in self.GetChildren():
@@ -115,7 +102,7 @@ class BotGUI(wx.Frame):
                         widget.SetForegroundColour(wx.Colour(0, 255, 0))
                         widget.SetFont(wx.Font(16, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
                         if '(+' in widget.GetLabel() or '(-' in widget.GetLabel():
-                            widget.SetLabel(widget.GetLabel().split(' (')[0] + f" (+{self.logic.position_profit:.2f})")
+                            widget.SetLabel(widget.GetLabel().split(' (')[0] + f" (+{self.snapshot['position_profit']:.2f})")
                             widget.SetForegroundColour(wx.Colour(255, 165, 0))
                     elif 'BTC USDT' in widget.GetLabel():
                         widget.SetForegroundColour(wx.Colour(255, 165, 0))
@@ -123,7 +110,7 @@ class BotGUI(wx.Frame):
                     elif 'ETH / USDT' in widget.GetLabel():
                         widget.SetForegroundColour(wx.Colour(0, 128, 0))
                         widget.SetFont(wx.Font(14, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
-                    elif widget in [self.log_button, self.stats_button]:
+                    elif widget in [self.log_button, self.stats_button, self.diagnostics_button]:
                         widget.SetForegroundColour(wx.Colour("white"))
                         widget.SetBackgroundColour(self.bg_color)
                         widget.SetFont(wx.Font(14, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
@@ -280,9 +267,21 @@ class BotGUI(wx.Frame):
             self.stats_button.Bind(wx.EVT_LEFT_DOWN, self.istatistik_penceresi)
             stats_sizer.Add(self.stats_button, 0, wx.ALL, 20)
             stats_panel.SetSizer(stats_sizer)
+            diagnostics_panel = wx.Panel(self, style=wx.BORDER_NONE)
+            diagnostics_panel.SetBackgroundColour(self.bg_color)
+            diagnostics_sizer = wx.BoxSizer(wx.HORIZONTAL)
+            self.diagnostics_button = wx.StaticText(diagnostics_panel, label="Tanılama")
+            self.diagnostics_button.SetForegroundColour(wx.Colour("white"))
+            self.diagnostics_button.SetBackgroundColour(self.bg_color)
+            self.diagnostics_button.SetFont(wx.Font(14, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_BOLD))
+            self.diagnostics_button.Bind(wx.EVT_LEFT_DOWN, self.tanilama_penceresi)
+            diagnostics_sizer.Add(self.diagnostics_button, 0, wx.ALL, 20)
+            diagnostics_panel.SetSizer(diagnostics_sizer)
             bottom_sizer = wx.BoxSizer(wx.HORIZONTAL)
             bottom_sizer.Add(log_panel, 0, wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL)
             bottom_sizer.AddStretchSpacer()
+            bottom_sizer.Add(diagnostics_panel, 0, wx.ALIGN_CENTER_VERTICAL)
+            bottom_sizer.AddStretchSpacer()
             bottom_sizer.Add(stats_panel, 0, wx.ALIGN_CENTER_VERTICAL)
             main_sizer.Add(bottom_sizer, 0, wx.EXPAND | wx.BOTTOM, 10)
             self.SetSizer(main_sizer)
@@ -295,26 +294,61 @@ class BotGUI(wx.Frame):
 
     def botu_baslat_durdur(self, event):
         try:
-            if self.logic.bot_running:
-                self.logic.stop_bot()
-                self.baslat_button.SetLabel("BAŞLAT")
-                self.baslat_button.SetBackgroundColour(wx.Colour("#006400"))
-                self.mesaj_label.SetLabel("Durum: Durduruldu")
-                self.play_sound("Bot_durduruldu.wav")
-            else:
-                self.logic.start_bot()
-                self.baslat_button.SetLabel("DURDUR")
-                self.baslat_button.SetBackgroundColour(wx.Colour("#FF0000"))
+            if self.pending_running is not None or self.snapshot is None:
+                # Önceki başlat/durdur komutu motorda işlenene kadar tıklamalar yok sayılır
+                return
+            self.pending_running = not self.snapshot['bot_running']
+            if self.pending_running:
+                self.engine.start_bot()
                 self.mesaj_label.SetLabel("Durum: Çalışıyor")
                 if notification:
                     notification.notify(title="Bot Aktif", message="Bot çalışmaya başladı.", timeout=5)
+            else:
+                self.engine.stop_bot()
+                self.mesaj_label.SetLabel("Durum: Durduruldu")
+                self.play_sound("Bot_durduruldu.wav")
+            # Komutlar sırayla işlendiğinden bu işaret başlat/durdur bittikten sonra GUI'ye döner
+            self.engine.submit(wx.CallAfter, self._toggle_done)
+            self._show_running(self.pending_running)
             self._refresh_theme()
-            logging.debug(f"Bot status changed: {'running' if self.logic.bot_running else 'stopped'}")
+            logging.debug(f"Bot status change requested: {'running' if self.pending_running else 'stopped'}")
         except Exception as e:
             logging.error(f"[gui.py:BotGUI.botu_baslat_durdur] Bot başlatma/durdurma hatası: {e}")
             print(f"Bot başlatma/durdurma hatası: {e}")
             self.mesaj_label.SetLabel(f"Hata: {e}")
 
+    def _toggle_done(self):
+        self.pending_running = None
+        self.refresh_ui()
+
+    def _show_running(self, running):
+        if running:
+            self.baslat_button.SetLabel("DURDUR")
+            self.baslat_button.SetBackgroundColour(wx.Colour("#FF0000"))
+        else:
+            self.baslat_button.SetLabel("BAŞLAT")
+            self.baslat_button.SetBackgroundColour(wx.Colour("#006400"))
+
+    def _load_coin_list(self):
+        coin_list = self.logic.get_coin_list()
+        wx.CallAfter(self._show_coin_list, coin_list)
+
+    def _show_coin_list(self, coin_list):
+        self.coin_list_cache = coin_list
+        self._fill_coin_listbox()
+
+    def _fill_coin_listbox(self, search_term=""):
+        try:
+            # Ayar penceresi kapanmışsa liste kutusu yok edilmiştir
+            if not getattr(self, 'coin_listbox', None) or self.coin_list_cache is None:
+                return
+            self.coin_listbox.Clear()
+            for coin in self.coin_list_cache:
+                if search_term == "" or coin.upper().startswith(search_term.upper()):
+                    self.coin_listbox.Append(coin)
+        except Exception as e:
+            logging.error(f"[gui.py:BotGUI._fill_coin_listbox] Coin listesi gösterilemedi: {e}")
+
     def play_sound(self, sound_path):
         try:
             pygame.mixer.init()
@@ -436,12 +470,20 @@ class BotGUI(wx.Frame):
             logging.error(f"[gui.py:BotGUI.switch_tab] Sekme değiştirme hatası: {e}")
             print(f"Sekme değiştirme hatası: {e}")
 
+    def _settings(self, tab):
+        # Canlı ayarlar motor iş parçacığında güncellenir; arayüz gönderilen son kopya üzerinde çalışır
+        return dict(self.pending_settings.get(tab) or (self.logic.long_settings if tab == "long" else self.logic.short_settings))
+
+    def _submit_settings(self, tab, settings):
+        self.pending_settings[tab] = dict(settings)
+        self.engine.submit(self.logic.update_long_settings if tab == "long" else self.logic.update_short_settings, **settings)
+
     def _save_form_to_settings(self, tab):
         try:
             form_dict = self.long_form if tab == "long" else self.short_form
-            settings = self.logic.long_settings if tab == "long" else self.logic.short_settings
+            settings = self._settings(tab)
             if not form_dict:
-                return
+                return None
             settings['rsi_condition'] = form_dict['rsi_condition_var'].GetStringSelection()
             settings['tp_percent'] = float(form_dict['tp_entry'].GetValue().replace(',', '.')) / 100 if form_dict['tp_check'].GetValue() and form_dict['tp_entry'].GetValue() else None
             settings['sl_percent'] = float(form_dict['sl_entry'].GetValue().replace(',', '.')) / 100 if form_dict['sl_check'].GetValue() and form_dict['sl_entry'].GetValue() else None
@@ -452,19 +494,18 @@ class BotGUI(wx.Frame):
             settings['volatility_threshold'] = float(form_dict['volatility_entry'].GetValue().replace(',', '.')) / 100 if form_dict['volatility_check'].GetValue() and form_dict['volatility_entry'].GetValue() else None
             settings['symbol'] = self.selected_coin
             settings['allowed_hours'] = [h for h in range(24) if self.hour_vars.get(h, False)]
-            if tab == "long":
-                self.logic.update_long_settings(**settings)
-            else:
-                self.logic.update_short_settings(**settings)
+            self._submit_settings(tab, settings)
+            return settings
         except Exception as e:
             logging.error(f"[gui.py:BotGUI._save_form_to_settings] Form kaydetme hatası: {e}")
             print(f"Form kaydetme hatası: {e}")
+            return None
 
     def _create_settings_frame(self):
         try:
             for child in self.settings_panel.GetChildren():
                 child.Destroy()
-            settings = self.logic.long_settings if self.current_tab == "long" else self.logic.short_settings
+            settings = self._settings(self.current_tab)
             form_dict = self.long_form if self.current_tab == "long" else self.short_form
             form_dict.clear()
             main_panel = wx.Panel(self.settings_panel, style=wx.BORDER_NONE)
@@ -488,15 +529,12 @@ class BotGUI(wx.Frame):
             self.coin_listbox.SetFont(wx.Font(11, wx.FONTFAMILY_DEFAULT, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
             left_sizer.Add(self.coin_listbox, 0, wx.ALL, 5)
             if self.coin_list_cache is None:
-                self.coin_list_cache = self.logic.get_coin_list()
-            for coin in self.coin_list_cache:
-                self.coin_listbox.Append(coin)
+                # Coin listesi ağ isteği gerektirebilir; wx iş parçacığı yerine motorda yüklenir
+                self.engine.submit(self._load_coin_list)
+            else:
+                self._fill_coin_listbox()
             def update_listbox(event):
-                search_term = self.coin_entry.GetValue().upper()
-                self.coin_listbox.Clear()
-                for coin in self.coin_list_cache:
-                    if search_term == "" or coin.upper().startswith(search_term):
-                        self.coin_listbox.Append(coin)
+                self._fill_coin_listbox(self.coin_entry.GetValue())
             def select_coin(event):
                 selection = self.coin_listbox.GetSelection()
                 if selection != wx.NOT_FOUND:
@@ -753,9 +791,9 @@ class BotGUI(wx.Frame):
             self.tum_ayarlari_kaydet_button.Refresh()
             wx.Yield()
             wx.MilliSleep(500)
-            self._save_form_to_settings(self.current_tab)
-            long_settings = self.logic.long_settings.copy()
-            short_settings = self.logic.short_settings.copy()
+            saved = self._save_form_to_settings(self.current_tab)
+            long_settings = saved if saved and self.current_tab == "long" else self._settings("long")
+            short_settings = saved if saved and self.current_tab == "short" else self._settings("short")
             if self.sync_settings:
                 synced_settings = {
                     'leverage': long_settings['leverage'],
@@ -766,12 +804,12 @@ class BotGUI(wx.Frame):
                 }
                 short_settings.update(synced_settings)
                 long_settings.update(synced_settings)
-                self.logic.update_long_settings(**long_settings)
-                self.logic.update_short_settings(**short_settings)
-            self.logic.set_data_source(self.long_form.get('data_source_choice', self.short_form.get('data_source_choice')).GetStringSelection())
-            self.logic.set_mum_sonu_bekle(self.long_form.get('mum_sonu_check', self.short_form.get('mum_sonu_check')).GetValue())
-            self.logic.set_disable_position(self.long_form.get('disable_position_choice', self.short_form.get('disable_position_choice')).GetStringSelection())
-            self.logic.save_selected_coins(self.selected_coin, self.selected_coin)
+                self._submit_settings("long", long_settings)
+                self._submit_settings("short", short_settings)
+            self.engine.submit(self.logic.set_data_source, self.long_form.get('data_source_choice', self.short_form.get('data_source_choice')).GetStringSelection())
+            self.engine.submit(self.logic.set_mum_sonu_bekle, self.long_form.get('mum_sonu_check', self.short_form.get('mum_sonu_check')).GetValue())
+            self.engine.submit(self.logic.set_disable_position, self.long_form.get('disable_position_choice', self.short_form.get('disable_position_choice')).GetStringSelection())
+            self.engine.submit(self.logic.save_selected_coins, self.selected_coin, self.selected_coin)
             logging.info(f"Ayarlar kaydedildi: Long={long_settings}, Short={short_settings}")
             wx.MessageBox("✔️ Ayarlar başarıyla kaydedildi!", "Başarılı", wx.OK | wx.ICON_INFORMATION)
             self.tum_ayarlari_kaydet_button.SetBackgroundColour("gray")
@@ -836,6 +874,35 @@ class BotGUI(wx.Frame):
             logging.error(f"[gui.py:BotGUI.istatistik_penceresi] İstatistik penceresi hatası: {e}")
             print(f"İstatistik penceresi hatası: {e}")
 
+    def tanilama_penceresi(self, event):
+        try:
+            diagnostics_frame = wx.Frame(self, title="Tanılama", size=(640, 420))
+            diagnostics_frame.SetBackgroundColour(self.bg_color)
+            diagnostics_sizer = wx.BoxSizer(wx.VERTICAL)
+            diagnostics_text = wx.TextCtrl(diagnostics_frame, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.HSCROLL)
+            diagnostics_text.SetBackgroundColour("#2e2e2e")
+            diagnostics_text.SetForegroundColour(wx.Colour(self.fg_color))
+            diagnostics_text.SetFont(wx.Font(10, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+            diagnostics_sizer.Add(diagnostics_text, 1, wx.EXPAND | wx.ALL, 10)
+            diagnostics_frame.SetSizer(diagnostics_sizer)
+
+            def update_diagnostics(evt=None):
+                content = self.logic.metrics.format()
+                if self.logic.metrics_server:
+                    content += f"\n\nMetrik adresi: http://{self.logic.metrics_server.host}:{self.logic.metrics_server.port}/metrics"
+                diagnostics_text.SetValue(content)
+
+            timer = wx.Timer(diagnostics_frame)
+            diagnostics_frame.Bind(wx.EVT_TIMER, update_diagnostics, timer)
+            diagnostics_frame.Bind(wx.EVT_CLOSE, lambda evt: (timer.Stop(), evt.Skip()))
+            update_diagnostics()
+            timer.Start(2000)
+            diagnostics_frame.Show()
+            logging.debug("Tanılama penceresi açıldı")
+        except Exception as e:
+            logging.error(f"[gui.py:BotGUI.tanilama_penceresi] Tanılama penceresi hatası: {e}")
+            print(f"Tanılama penceresi hatası: {e}")
+
 if __name__ == "__main__":
     try:
         print("Program başlatılıyor...")
@@ -0,0 +1,89 @@
+import os
+import threading
+import logging
+import certifi
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.util import Retry, Timeout
+from urllib3.util.ssl_ import create_urllib3_context
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    def __init__(self, transport):
+        self.transport = transport
+        super().__init__(max_retries=transport.retries)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self.poolmanager = self.transport.pool_manager
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (self.transport.connect_timeout, self.transport.read_timeout)
+        return super().send(request, timeout=timeout, **kwargs)
+
+    def close(self):
+        # Ortak havuz diğer istemcilerce kullanılıyor; yalnızca bu adaptörün proxy havuzları kapatılır
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+class HttpTransport:
+    def __init__(self, num_pools=8, maxsize=16, connect_timeout=3.05, read_timeout=10, retries=2, backoff_factor=0.2):
+        self.logger = logging.getLogger('BotLogger')
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # Bağlantı hataları her yöntemde, okuma/durum hataları yalnızca idempotent isteklerde yeniden denenir
+        self.retries = Retry(total=retries, connect=retries, read=retries, status=retries, other=0,
+                             backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                             allowed_methods=IDEMPOTENT_METHODS, raise_on_status=False, respect_retry_after_header=False)
+        # Tek TLS bağlamı: CA deposu bir kez yüklenir, açık bağlantılar keep-alive ile yeniden kullanılır
+        self.ssl_context = create_urllib3_context()
+        self.ssl_context.load_verify_locations(certifi.where())
+        self.pool_manager = PoolManager(num_pools=num_pools, maxsize=maxsize, block=False,
+                                        timeout=Timeout(connect=connect_timeout, read=read_timeout),
+                                        retries=self.retries, ssl_context=self.ssl_context)
+        self.adapter = SharedPoolAdapter(self)
+
+    def mount(self, session):
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        return session
+
+    def session(self):
+        return self.mount(requests.Session())
+
+    def attach(self, api_client):
+        rest_client = getattr(api_client, 'rest_client', None)
+        if rest_client is None or not hasattr(rest_client, 'pool_manager'):
+            self.logger.warning(f"[http_transport.py:HttpTransport.attach] {type(api_client).__name__} ortak havuza bağlanamadı")
+            return api_client
+        rest_client.pool_manager = self.pool_manager
+        return api_client
+
+    def pools(self):
+        return len(self.pool_manager.pools)
+
+    def clear(self):
+        self.pool_manager.clear()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def shared_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport(
+                num_pools=int(os.getenv("HTTP_POOL_HOSTS", 8)),
+                maxsize=int(os.getenv("HTTP_POOL_SIZE", 16)),
+                connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05)),
+                read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", 10)),
+                retries=int(os.getenv("HTTP_RETRIES", 2)),
+            )
+        return _transport
@@ -0,0 +1,297 @@
+import math
+from collections import deque
+import numpy as np
+
+
+class IndicatorEngine:
+    def __init__(self, rsi_window=6, ma_window=7, bb_window=20, bb_dev=2, vol_window=20, resync_every=500):
+        self.rsi_window = rsi_window
+        self.ma_window = ma_window
+        self.bb_window = bb_window
+        self.bb_dev = bb_dev
+        self.vol_window = vol_window
+        self.resync_every = resync_every
+        self.reset()
+
+    def reset(self):
+        self.closes = deque(maxlen=max(self.ma_window, self.bb_window, self.vol_window + 1))
+        self.returns = deque(maxlen=self.vol_window)
+        self.count = 0
+        self.last_timestamp = None
+        self._alpha = 1.0 / self.rsi_window
+        self._avg_up = 0.0
+        self._avg_dn = 0.0
+        self._prev_avg_up = 0.0
+        self._prev_avg_dn = 0.0
+        self._ref = None
+        self._ma_sum = 0.0
+        self._bb_sum = 0.0
+        self._bb_sumsq = 0.0
+        self._vol_sum = 0.0
+        self._vol_sumsq = 0.0
+        self._since_resync = 0
+
+    def _rsi_step(self, diff):
+        up = diff if diff > 0 else 0.0
+        dn = -diff if diff < 0 else 0.0
+        self._avg_up = self._prev_avg_up + self._alpha * (up - self._prev_avg_up)
+        self._avg_dn = self._prev_avg_dn + self._alpha * (dn - self._prev_avg_dn)
+
+    def append(self, close, timestamp=None):
+        close = float(close)
+        if self._ref is None:
+            self._ref = close
+        x = close - self._ref
+        if self.closes:
+            prev = self.closes[-1]
+            self._prev_avg_up, self._prev_avg_dn = self._avg_up, self._avg_dn
+            self._rsi_step(close - prev)
+            ret = (close - prev) / prev if prev else 0.0
+            if len(self.returns) == self.vol_window:
+                old = self.returns[0]
+                self._vol_sum -= old
+                self._vol_sumsq -= old * old
+            self.returns.append(ret)
+            self._vol_sum += ret
+            self._vol_sumsq += ret * ret
+        if len(self.closes) >= self.ma_window:
+            self._ma_sum -= self.closes[-self.ma_window] - self._ref
+        if len(self.closes) >= self.bb_window:
+            old = self.closes[-self.bb_window] - self._ref
+            self._bb_sum -= old
+            self._bb_sumsq -= old * old
+        self._ma_sum += x
+        self._bb_sum += x
+        self._bb_sumsq += x * x
+        self.closes.append(close)
+        self.count += 1
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        self._since_resync += 1
+        if self._since_resync >= self.resync_every:
+            self._resync()
+
+    def update_last(self, close):
+        if not self.closes:
+            self.append(close)
+            return
+        close = float(close)
+        old_close = self.closes[-1]
+        if close == old_close:
+            return
+        delta = close - old_close
+        old_x = old_close - self._ref
+        new_x = close - self._ref
+        self._ma_sum += delta
+        self._bb_sum += delta
+        self._bb_sumsq += new_x * new_x - old_x * old_x
+        if len(self.closes) >= 2:
+            prev = self.closes[-2]
+            self._rsi_step(close - prev)
+            old_ret = self.returns[-1]
+            ret = (close - prev) / prev if prev else 0.0
+            self.returns[-1] = ret
+            self._vol_sum += ret - old_ret
+            self._vol_sumsq += ret * ret - old_ret * old_ret
+        self.closes[-1] = close
+
+    def _resync(self):
+        self._since_resync = 0
+        self._ref = self.closes[-1]
+        closes = list(self.closes)
+        ma = [c - self._ref for c in closes[-self.ma_window:]]
+        bb = [c - self._ref for c in closes[-self.bb_window:]]
+        self._ma_sum = math.fsum(ma)
+        self._bb_sum = math.fsum(bb)
+        self._bb_sumsq = math.fsum(v * v for v in bb)
+        self._vol_sum = math.fsum(self.returns)
+        self._vol_sumsq = math.fsum(r * r for r in self.returns)
+
+    def sync(self, timestamps, closes):
+        n = len(timestamps)
+        if n == 0:
+            return False
+        start = 0
+        if self.last_timestamp is not None and timestamps[0] <= self.last_timestamp:
+            start = int(np.searchsorted(timestamps, self.last_timestamp))
+            if start == n:
+                return False
+            if timestamps[start] == self.last_timestamp:
+                self.update_last(closes[start])
+                start += 1
+            else:
+                self.reset()
+                start = 0
+        else:
+            self.reset()
+        for i in range(start, n):
+            self.append(closes[i], timestamps[i])
+        return True
+
+    def rsi(self):
+        if self.count < self.rsi_window:
+            return float('nan')
+        if self._avg_dn == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._avg_up / self._avg_dn)
+
+    def ma(self):
+        if self.count < self.ma_window:
+            return float('nan')
+        return self._ref + self._ma_sum / self.ma_window
+
+    def ma_distance(self):
+        if not self.closes:
+            return float('nan')
+        ma = self.ma()
+        return (self.closes[-1] - ma) / ma
+
+    def bollinger(self):
+        if self.count < self.bb_window:
+            return float('nan'), float('nan')
+        mean = self._bb_sum / self.bb_window
+        std = math.sqrt(max(self._bb_sumsq / self.bb_window - mean * mean, 0.0))
+        mavg = self._ref + mean
+        return mavg + self.bb_dev * std, mavg - self.bb_dev * std
+
+    def volatility(self):
+        n = len(self.returns)
+        if n < self.vol_window:
+            return float('nan')
+        var = (self._vol_sumsq - self._vol_sum * self._vol_sum / n) / (n - 1)
+        return math.sqrt(max(var, 0.0)) * 100
+
+    def snapshot(self):
+        hband, lband = self.bollinger()
+        return {
+            'close': self.closes[-1] if self.closes else float('nan'),
+            'rsi': self.rsi(),
+            'ma7': self.ma(),
+            'ma7_distance': self.ma_distance(),
+            'bollinger_hband': hband,
+            'bollinger_lband': lband,
+            'volatility': self.volatility(),
+        }
+
+
+def _rolling_sum(values, window):
+    total = np.cumsum(values, axis=1)
+    total[:, window:] = total[:, window:] - total[:, :-window]
+    return total
+
+
+def _ewm(values, alpha, block=128):
+    decay = 1.0 - alpha
+    out = np.empty_like(values)
+    carry = np.zeros(values.shape[0])
+    for start in range(0, values.shape[1], block):
+        chunk = values[:, start:start + block]
+        k = np.arange(1, chunk.shape[1] + 1)
+        powers = decay ** k
+        acc = np.cumsum(chunk / powers, axis=1)
+        out[:, start:start + block] = powers * (carry[:, None] + alpha * acc)
+        carry = out[:, start + chunk.shape[1] - 1]
+    return out
+
+
+def panel_indicators(closes, rsi_window=6, ma_window=7, bb_window=20, bb_dev=2, vol_window=20):
+    closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+    valid = ~np.isnan(closes)
+    seen = np.cumsum(valid, axis=1)
+    ref = np.nanmax(np.where(seen == 1, closes, np.nan), axis=1, initial=0.0)[:, None]
+    shifted = np.where(valid, closes - ref, 0.0)
+    nan = np.full(closes.shape, np.nan)
+
+    diff = np.zeros(closes.shape)
+    diff[:, 1:] = np.nan_to_num(closes[:, 1:] - closes[:, :-1])
+    avg_up = _ewm(np.where(diff > 0, diff, 0.0), 1.0 / rsi_window)
+    avg_dn = _ewm(np.where(diff < 0, -diff, 0.0), 1.0 / rsi_window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_dn == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_dn))
+    rsi = np.where(valid & (seen >= rsi_window), rsi, np.nan)
+
+    ma_full = _rolling_sum(valid.astype(np.float64), ma_window) == ma_window
+    ma = np.where(ma_full, ref + _rolling_sum(shifted, ma_window) / ma_window, nan)
+
+    bb_full = _rolling_sum(valid.astype(np.float64), bb_window) == bb_window
+    mean = _rolling_sum(shifted, bb_window) / bb_window
+    var = np.maximum(_rolling_sum(shifted * shifted, bb_window) / bb_window - mean * mean, 0.0)
+    std = np.sqrt(var)
+    mavg = ref + mean
+    hband = np.where(bb_full, mavg + bb_dev * std, nan)
+    lband = np.where(bb_full, mavg - bb_dev * std, nan)
+
+    returns = np.full(closes.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[:, 1:] = closes[:, 1:] / closes[:, :-1] - 1.0
+    ret_valid = ~np.isnan(returns)
+    ret = np.where(ret_valid, returns, 0.0)
+    ret_sum = _rolling_sum(ret, vol_window)
+    ret_sumsq = _rolling_sum(ret * ret, vol_window)
+    ret_var = np.maximum((ret_sumsq - ret_sum * ret_sum / vol_window) / (vol_window - 1), 0.0)
+    volatility = np.where(_rolling_sum(ret_valid.astype(np.float64), vol_window) == vol_window, np.sqrt(ret_var) * 100, nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ma_distance = (closes - ma) / ma
+    return {
+        'close': closes,
+        'rsi': rsi,
+        'ma7': ma,
+        'ma7_distance': ma_distance,
+        'bollinger_hband': hband,
+        'bollinger_lband': lband,
+        'volatility': volatility,
+    }
+
+
+def reference_indicators(closes, rsi_window=6, ma_window=7, bb_window=20, bb_dev=2, vol_window=20):
+    import pandas as pd
+    import ta
+    close = pd.Series(np.asarray(closes, dtype=np.float64))
+    ma = close.rolling(window=ma_window).mean()
+    bollinger = ta.volatility.BollingerBands(close, window=bb_window, window_dev=bb_dev)
+    return {
+        'close': close.to_numpy(),
+        'rsi': ta.momentum.RSIIndicator(close, window=rsi_window).rsi().to_numpy(),
+        'ma7': ma.to_numpy(),
+        'ma7_distance': ((close - ma) / ma).to_numpy(),
+        'bollinger_hband': bollinger.bollinger_hband().to_numpy(),
+        'bollinger_lband': bollinger.bollinger_lband().to_numpy(),
+        'volatility': (close.pct_change().rolling(window=vol_window).std() * 100).to_numpy(),
+    }
+
+
+def _max_error(value, expected):
+    mask = ~np.isnan(expected)
+    if np.isnan(value[mask]).any():
+        return float('inf')
+    return float(np.max(np.abs(value[mask] - expected[mask]) / np.maximum(1.0, np.abs(expected[mask])), initial=0.0))
+
+
+def check_parity(closes, forming=None, resync_every=50):
+    # forming: her mum için kapanıştan önce görülen ara fiyatlar; update_last yolunu sınar
+    closes = np.asarray(closes, dtype=np.float64)
+    expected = reference_indicators(closes)
+    engine = IndicatorEngine(resync_every=resync_every)
+    streamed = {name: np.full(len(closes), np.nan) for name in expected}
+    for i, close in enumerate(closes):
+        for price in (forming[i] if forming is not None else ()):
+            engine.sync(np.arange(i + 1), np.r_[closes[:i], price])
+        engine.sync(np.arange(i + 1), closes[:i + 1])
+        for name, value in engine.snapshot().items():
+            streamed[name][i] = value
+    panel = panel_indicators(closes)
+    return {
+        'engine': max(_max_error(streamed[name], expected[name]) for name in expected),
+        'panel': max(_max_error(panel[name][0], expected[name]) for name in expected),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    rng = np.random.default_rng(7)
+    closes = 100 * np.exp(np.cumsum(rng.standard_normal(400) * 0.01))
+    forming = [closes[i] * (1 + rng.standard_normal(3) * 0.002) for i in range(len(closes))]
+    errors = check_parity(closes, forming)
+    print(f"Göstergeler ta ile karşılaştırıldı: motor {errors['engine']:.2e}, panel {errors['panel']:.2e}")
+    sys.exit(0 if max(errors.values()) < 1e-8 else 1)
@@ -1,39 +1,33 @@
-import pandas as pd
-import ta
-from datetime import datetime
 import logging
 import logging.handlers
-from colorama import Fore, Style, init
-from gate_api import ApiClient, Configuration, FuturesApi, FuturesOrder
 import threading
-import pygame
+import copy
 import time
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import os
-import hmac
-import hashlib
+from indicators import IndicatorEngine
+from candle_store import CandleStore
+from candle_sync import CandleSync, interval_seconds
+from candle_archive import CandleArchive
+from candle_scheduler import CandleScheduler
+from price_feed import PriceFeed
+from position_supervisor import PositionSupervisor
+from portfolio import Portfolio
+from clock import SystemClock
+from metrics import Metrics
+from circuit_breaker import CircuitBreaker, ErrorDigest, GuardedApi
+from contract_registry import CACHE_FILES, ContractRegistry, gate_contract_specs
+from strategy import DEFAULT_LONG_SETTINGS, DEFAULT_SHORT_SETTINGS, long_signal, short_signal
 
-init(autoreset=True)
 load_dotenv()
 
-class CustomConfiguration(Configuration):
-    def __init__(self, key, secret):
-        super().__init__(key=key, secret=secret)
-        self.api_key = key
-        self.api_secret = secret.encode('utf-8')
-
-    def sign(self, method, url, query_string=None, payload_string=None):
-        t = str(int(time.time()))
-        m = hashlib.sha512()
-        m.update((payload_string or '').encode('utf-8'))
-        hashed_payload = m.hexdigest()
-        s = f'{method}\n{url}\n{query_string or ""}\n{hashed_payload}\n{t}'
-        sign = hmac.new(self.api_secret, s.encode('utf-8'), hashlib.sha512).hexdigest()
-        return {'KEY': self.api_key, 'Timestamp': t, 'SIGN': sign}
-
 class BotLogic:
-    def __init__(self):
+    def __init__(self, clock=None, audio=True):
+        self.clock = clock or SystemClock()
+        self.audio_enabled = audio
+        self._mixer_ready = False
+        self.cycle_interval = 10
         self.bot_running = False
         self.symbol = "DOGE_USDT"
         self.found_symbol = None
@@ -51,52 +45,62 @@ class BotLogic:
         self.short_basarisiz = 0
         self.data_source = "gateio"
         self.mum_sonu_bekle = False
-        self.current_long_position = None
-        self.current_short_position = None
-        self.position_entry_price = 0
-        self.position_profit = 0
-        self.monitor_thread_long = None
-        self.monitor_thread_short = None
+        self.portfolio = Portfolio()
         self.disable_position = "Hiçbiri"
         self.last_coin_list_log = None
-
-        self.long_settings = {
-            'symbol': 'DOGE_USDT',
-            'tp_percent': 0.01,
-            'sl_percent': 0.017,
-            'leverage': 15,
-            'rsi_threshold': 20.0,
-            'rsi_condition': 'Küçüktür',
-            'ma7_threshold': 0.007,
-            'bollinger_band_break_pct': 0.0025,
-            'volatility_threshold': 0.5,
-            'allowed_hours': list(range(24))
-        }
-        self.short_settings = {
-            'symbol': 'DOGE_USDT',
-            'tp_percent': 0.01,
-            'sl_percent': 0.017,
-            'leverage': 15,
-            'rsi_threshold': 80.0,
-            'rsi_condition': 'Büyüktür',
-            'ma7_threshold': 0.007,
-            'bollinger_band_break_pct': 0.0025,
-            'volatility_threshold': 0.5,
-            'allowed_hours': list(range(24))
-        }
+        self.indicator_engines = {}
+        self.candle_store = CandleStore(capacity=100)
+        self.candle_sync = CandleSync(self.fetch_candle_rows)
+        self.candle_archive = CandleArchive(os.getenv("CANDLE_ARCHIVE_DIR", "candle_archive"), source="gateio_futures")
+        self.price_feed = PriceFeed(self.fetch_tickers, interval=3)
+        self.supervisor = PositionSupervisor(self.price_feed, self.clock, self.on_position_tick, self.on_position_timer)
+        self.candle_scheduler = CandleScheduler(self.clock, server_time=self.fetch_server_time)
+        self.market_stream = None
+        self.exchange_breaker = CircuitBreaker("gateio_futures", failure_threshold=3, base_delay=2, max_delay=120)
+        self.error_digest = ErrorDigest(window=300)
+        self.metrics = Metrics()
+        self.metrics_port = int(os.getenv("METRICS_PORT", "9108") or 0)
+        self.metrics_server = None
+        self.io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="BotIO")
+        self.archive_backfills = {}
+        self.reported_balance = None
+
+        self.long_settings = copy.deepcopy(DEFAULT_LONG_SETTINGS)
+        self.short_settings = copy.deepcopy(DEFAULT_SHORT_SETTINGS)
 
         self.gate_api_key = os.getenv("GATE_API_KEY")
         self.gate_api_secret = os.getenv("GATE_API_SECRET")
         self.telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         self.telegram_chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self.simulator = None
+        self.exchange_mode = os.getenv("EXCHANGE_MODE", "live").lower()
+        self.exit_mode = os.getenv("EXIT_ORDERS", "local").lower()
+        self.exit_orders = None
+        self.order_gateway = None
+        self.exit_grace = float(os.getenv("EXIT_GRACE", "10"))
+        self.exit_reconcile_interval = 30
+        self.close_retry_delay = 5
+        self.stale_exit_orders = {}
+        self.stale_exit_lock = threading.RLock()
+        self.streaming_enabled = os.getenv("MARKET_STREAMING", "0") == "1"
+        self.market_stream_url = os.getenv("MARKET_STREAM_URL")
+        self.scan_universe = os.getenv("SCAN_UNIVERSE", "")
+        self.scan_interval = int(os.getenv("SCAN_INTERVAL", "900"))
+        self.scanner = None
+        self.scan_thread = None
+        self.last_scan_time = 0
+        self.scan_results = []
 
         self.log_file = "islem_log.txt"
         self.coin_list_log_file = "coin_list_log.txt"
+        # Simülatörün arşivden türettiği kontrat listesi canlı botun coinlist.json dosyasının üzerine yazılmaz
+        self.contract_registry = ContractRegistry(self.fetch_contracts, cache_file=None if self.exchange_mode == "sim" else CACHE_FILES['gateio'], ttl=3600)
 
         self.setup_logging()
+        self.start_metrics_server()
+        self.setup_notifier()
         self.setup_exchange()
         self.fetch_initial_data()
-        pygame.mixer.init()
 
     def setup_logging(self):
         self.logger = logging.getLogger('BotLogger')
@@ -114,39 +118,99 @@ class BotLogic:
         coin_handler.setFormatter(formatter)
         coin_list_logger.addHandler(coin_handler)
 
-    def send_telegram_message(self, message):
+    def warm_order_gateway(self):
+        if self.order_gateway is None:
+            return None
+        targets = dict.fromkeys((self.symbol, str(settings['leverage'])) for settings in (self.short_settings, self.long_settings))
+        return self.io_pool.submit(self.order_gateway.warm, list(targets))
+
+    def start_metrics_server(self):
+        if not self.metrics_port:
+            return
+        from metrics import MetricsServer
+        self.metrics_server = MetricsServer(self.metrics, port=self.metrics_port)
+        if not self.metrics_server.start():
+            self.metrics_server = None
+
+    def setup_notifier(self):
         try:
-            if not self.telegram_bot_token or not self.telegram_chat_id:
-                raise ValueError("TELEGRAM_BOT_TOKEN veya TELEGRAM_CHAT_ID eksik")
-            url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
-            payload = {
-                "chat_id": self.telegram_chat_id,
-                "text": message
-            }
-            response = requests.post(url, json=payload)
-            if response.status_code != 200:
-                raise Exception(f"Telegram API hatası: {response.text}")
-            self.logger.info(f"Telegram mesajı gönderildi: {message}")
+            from telegram_notifier import TelegramNotifier
+            self.notifier = TelegramNotifier(self.log_file, bot_token=self.telegram_bot_token, chat_id=self.telegram_chat_id, metrics=self.metrics)
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.send_telegram_message] Telegram mesajı gönderilemedi: {e}")
-            print(f"Telegram mesajı gönderilemedi: {e}")
+            self.notifier = None
+            self.logger.error(f"[logic.py:BotLogic.setup_notifier] Telegram bildirimi devre dışı: {e}")
+
+    def send_telegram_message(self, message):
+        if self.notifier is None:
+            self.logger.error("[logic.py:BotLogic.send_telegram_message] Telegram mesajı gönderilemedi: TELEGRAM_BOT_TOKEN veya TELEGRAM_CHAT_ID eksik")
+            return
+        self.notifier.send_message(message)
+
+    def report_error(self, source, log_message, telegram_message, error=None):
+        if self.error_digest.record((source, type(error).__name__ if error else log_message)):
+            self.logger.error(log_message)
+            self.send_telegram_message(telegram_message)
+        else:
+            self.logger.debug(log_message)
+
+    def flush_error_digest(self):
+        for message in self.error_digest.due():
+            self.logger.warning(f"Hata özeti: {message}")
+            self.send_telegram_message(f"Hata özeti: {message}")
 
     def setup_exchange(self):
         try:
-            config = CustomConfiguration(key=self.gate_api_key, secret=self.gate_api_secret)
-            self.exchange = FuturesApi(ApiClient(config))
-            self.balance = self.get_balance()
+            if self.exchange_mode == "sim":
+                api = self.create_simulator()
+            else:
+                from gate_client import create_futures_api
+                api = create_futures_api(self.gate_api_key, self.gate_api_secret)
+                if self.exchange_mode == "paper":
+                    api = self.create_simulator(api)
+            self.exchange = GuardedApi(api, self.exchange_breaker, self.metrics)
+            from order_gateway import OrderGateway
+            self.order_gateway = OrderGateway(self.exchange, self.clock, metrics=self.metrics, executor=self.io_pool)
+            if self.exit_mode == "exchange":
+                from exit_orders import ExitOrders
+                self.exit_orders = ExitOrders(self.exchange)
             self.logger.info("Borsa bağlantısı başarılı")
             self.send_telegram_message("Bot başlatıldı! Borsa bağlantısı başarılı.")
         except Exception as e:
             self.logger.error(f"[logic.py:BotLogic.setup_exchange] Borsa bağlantı hatası: {e}")
             self.send_telegram_message(f"Hata: Borsa bağlantısı kurulamadı: {e}")
 
+    def create_simulator(self, market=None):
+        from exchange_simulator import SimulatedFuturesApi
+        balance = float(os.getenv("SIM_BALANCE", "1000"))
+        if market is not None:
+            self.logger.info(f"Kağıt üzerinde işlem modu: emirler simüle ediliyor, başlangıç bakiyesi {balance:.2f} USDT")
+            self.simulator = SimulatedFuturesApi(balance=balance, market=market, clock=self.clock.time)
+            return self.simulator
+        symbols = [symbol.strip() for symbol in os.getenv("SIM_SYMBOLS", self.symbol).split(",") if symbol.strip()]
+        simulator = SimulatedFuturesApi(
+            balance=balance,
+            clock=self.clock.time,
+            latency=float(os.getenv("SIM_LATENCY", "0")),
+            latency_jitter=float(os.getenv("SIM_LATENCY_JITTER", "0")),
+            error_rate=float(os.getenv("SIM_ERROR_RATE", "0")),
+        )
+        simulator.load_archive(self.candle_archive, symbols, "15m")
+        self.simulator = simulator
+        self.logger.info(f"Borsa simülatörü: {len(symbols)} sembol yerel arşivden yüklendi, başlangıç bakiyesi {balance:.2f} USDT")
+        return simulator
+
     def fetch_initial_data(self):
         try:
-            self.get_coin_list()
+            started = time.perf_counter()
+            # Kontrat listesi ve mumlar önce yerel kopyadan yüklenir, borsadan yalnızca eksikler beklenir
+            self.contract_registry.load()
+            coin_list = self.io_pool.submit(self.get_coin_list)
+            server_time = self.io_pool.submit(self.candle_scheduler.sync)
+            self.warm_order_gateway()
             self.update_data()
-            self.logger.info("Başlangıç verileri başarıyla çekildi")
+            coin_list.result()
+            server_time.result()
+            self.logger.info(f"Başlangıç verileri {time.perf_counter() - started:.2f} saniyede başarıyla çekildi")
         except Exception as e:
             self.logger.error(f"[logic.py:BotLogic.fetch_initial_data] Başlangıç verileri çekilemedi: {e}")
             self.send_telegram_message(f"Hata: Başlangıç verileri çekilemedi: {e}")
@@ -156,28 +220,39 @@ class BotLogic:
             settle = "usdt"
             futures_account = self.exchange.list_futures_accounts(settle)
             balance = float(futures_account.available)
-            self.logger.info(f"Kullanılabilir bakiye: {balance:.2f} USDT")
-            self.send_telegram_message(f"Toplam Bakiye: {balance:.2f} USDT")
+            if self.order_gateway:
+                self.order_gateway.set_balance(balance)
+            if balance != self.reported_balance:
+                self.logger.info(f"Kullanılabilir bakiye: {balance:.2f} USDT")
+                self.send_telegram_message(f"Toplam Bakiye: {balance:.2f} USDT")
+                self.reported_balance = balance
             return balance
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.get_balance] Bakiye alınamadı: {e}")
-            self.send_telegram_message(f"Hata: Bakiye alınamadı: {e}")
+            self.report_error("get_balance", f"[logic.py:BotLogic.get_balance] Bakiye alınamadı: {e}", f"Hata: Bakiye alınamadı: {e}", e)
             return 0
 
+    def fetch_contracts(self):
+        settle = "usdt"
+        return gate_contract_specs(self.exchange.list_futures_contracts(settle))
+
+    def get_contract_spec(self, symbol):
+        try:
+            return self.contract_registry.get(symbol)
+        except Exception as e:
+            self.report_error("get_contract_spec", f"[logic.py:BotLogic.get_contract_spec] Kontrat bilgisi alınamadı: {e}", f"Hata: Kontrat bilgisi alınamadı: {e}", e)
+            return None
+
     def get_coin_list(self):
         try:
-            settle = "usdt"
-            contracts = self.exchange.list_futures_contracts(settle)
-            coin_list = [contract.name for contract in contracts]
-            today = datetime.now().date()
+            coin_list = self.contract_registry.names()
+            today = self.clock.now().date()
             if self.last_coin_list_log != today:
                 coin_list_logger = logging.getLogger('CoinListLogger')
                 coin_list_logger.info(f"Coin listesi: {coin_list}")
                 self.last_coin_list_log = today
-            return sorted(coin_list)
+            return coin_list
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.get_coin_list] Coin listesi alınamadı: {e}")
-            self.send_telegram_message(f"Hata: Coin listesi alınamadı: {e}")
+            self.report_error("get_coin_list", f"[logic.py:BotLogic.get_coin_list] Coin listesi alınamadı: {e}", f"Hata: Coin listesi alınamadı: {e}", e)
             return []
 
     def save_selected_coins(self, long_coin, short_coin):
@@ -189,7 +264,13 @@ class BotLogic:
             self.send_telegram_message(f"Hata: Coin seçimleri loglanamadı: {e}")
 
     def play_sound(self, sound_path):
+        if not self.audio_enabled:
+            return
         try:
+            import pygame
+            if not self._mixer_ready:
+                pygame.mixer.init()
+                self._mixer_ready = True
             pygame.mixer.music.load(sound_path)
             pygame.mixer.music.play()
         except Exception as e:
@@ -197,113 +278,265 @@ class BotLogic:
             self.send_telegram_message(f"Hata: Ses çalınamadı: {e}")
 
     def check_symbol_exists(self, symbol):
-        if self.found_symbol:
+        if self.found_symbol == symbol:
             return True
         try:
-            settle = "usdt"
-            contracts = self.exchange.list_futures_contracts(settle)
-            for contract in contracts:
-                if contract.name == symbol:
-                    self.found_symbol = contract.name
-                    self.symbol = self.found_symbol
-                    self.logger.info(f"Sembol bulundu: {self.found_symbol}")
-                    return True
+            if self.contract_registry.exists(symbol):
+                self.found_symbol = symbol
+                self.symbol = self.found_symbol
+                self.logger.info(f"Sembol bulundu: {self.found_symbol}")
+                return True
             self.logger.error(f"{symbol} sembolü Gate.io vadeli işlemde bulunamadı")
             self.send_telegram_message(f"Hata: {symbol} sembolü Gate.io vadeli işlemde bulunamadı")
             return False
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.check_symbol_exists] Sembol kontrol hatası: {e}")
-            self.send_telegram_message(f"Hata: Sembol kontrol hatası: {e}")
+            self.report_error("check_symbol_exists", f"[logic.py:BotLogic.check_symbol_exists] Sembol kontrol hatası: {e}", f"Hata: Sembol kontrol hatası: {e}", e)
             return False
 
+    def fetch_candle_rows(self, symbol, interval, limit=None, start=None, end=None):
+        settle = "usdt"
+        candlesticks = self.exchange.list_futures_candlesticks(settle, symbol, interval=interval, limit=limit, _from=start, to=end)
+        return [(int(c.t), float(c.o), float(c.h), float(c.l), float(c.c), float(c.v)) for c in candlesticks or []]
+
+    def fetch_last_price(self, symbol, interval='15m'):
+        settle = "usdt"
+        candles = self.exchange.list_futures_candlesticks(settle, symbol, interval=interval, limit=1)
+        return float(candles[0].c) if candles else None
+
+    def fetch_server_time(self):
+        if self.exchange_mode == "sim":
+            return self.clock.time()
+        from gate_client import fetch_server_time
+        return fetch_server_time()
+
+    def fetch_tickers(self, contracts=None):
+        settle = "usdt"
+        if contracts is None:
+            tickers = self.exchange.list_futures_tickers(settle)
+        else:
+            tickers = [ticker for contract in contracts for ticker in self.exchange.list_futures_tickers(settle, contract=contract)]
+        return {ticker.contract: (float(ticker.last), float(ticker.mark_price)) for ticker in tickers}
+
     def fetch_ohlcv(self, symbol, timeframe='15m', limit=100):
         try:
-            settle = "usdt"
-            candlesticks = self.exchange.list_futures_candlesticks(settle, symbol, interval=timeframe, limit=limit)
-            if not candlesticks:
-                self.logger.error(f"OHLCV verisi boş döndü. Sembol: {symbol}, Zaman Aralığı: {timeframe}, Limit: {limit}")
-                self.send_telegram_message(f"Hata: OHLCV verisi boş döndü. Sembol: {symbol}")
+            candles = self.candle_store.get(symbol, timeframe)
+            primed = self.candle_sync.primed(symbol, timeframe)
+            stream = self.market_stream
+            if primed and len(candles) >= min(limit, candles.capacity) and stream and stream.is_streaming(symbol, timeframe):
+                return candles
+            if not len(candles) or not primed:
+                self.candle_sync.reset(symbol, timeframe)
+                self.warm_start_candles(symbol, timeframe, candles, limit)
+            epoch = stream.epoch if stream else None
+            now = self.clock.time()
+            rows = self.candle_sync.sync(symbol, timeframe, limit=limit, now=now)
+            if not rows:
+                self.report_error("fetch_ohlcv", f"OHLCV verisi boş döndü. Sembol: {symbol}, Zaman Aralığı: {timeframe}, Limit: {limit}", f"Hata: OHLCV verisi boş döndü. Sembol: {symbol}")
                 return None
-            data = [[int(c.t), float(c.o), float(c.h), float(c.l), float(c.c), float(c.v)] for c in candlesticks]
-            df = pd.DataFrame(data, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-            return df
+            with self.metrics.timer("candle_merge"):
+                candles.merge_rows(rows)
+            self.archive_rows(symbol, timeframe, rows, now)
+            if stream:
+                stream.mark_synced(symbol, timeframe, epoch)
+            return candles
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.fetch_ohlcv] OHLCV verisi alınamadı: {e}. Sembol: {symbol}, Zaman Aralığı: {timeframe}, Limit: {limit}")
-            self.send_telegram_message(f"Hata: OHLCV verisi alınamadı: {e}")
+            self.report_error("fetch_ohlcv", f"[logic.py:BotLogic.fetch_ohlcv] OHLCV verisi alınamadı: {e}. Sembol: {symbol}, Zaman Aralığı: {timeframe}, Limit: {limit}", f"Hata: OHLCV verisi alınamadı: {e}", e)
             return None
 
-    def calculate_indicators(self, df):
+    def archive_rows(self, symbol, timeframe, rows, now):
+        last = self.candle_archive.last_timestamp(symbol, timeframe)
+        if last is None or rows[0][0] <= last + interval_seconds(timeframe):
+            self.candle_archive.append(symbol, timeframe, rows, now=now)
+            return
+        key = (symbol, timeframe)
+        pending = self.archive_backfills.get(key)
+        if pending is None or pending.done():
+            # Kesinti limit mumdan uzun sürdü; arşivdeki boşluk önce borsadan doldurulur
+            self.archive_backfills[key] = self.io_pool.submit(self.backfill_archive, symbol, timeframe, now)
+
+    def backfill_archive(self, symbol, timeframe, now):
+        try:
+            self.candle_archive.sync(symbol, timeframe, self.fetch_candle_rows, now=now)
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.backfill_archive] Mum arşivindeki boşluk doldurulamadı: {e}. Sembol: {symbol}, Zaman Aralığı: {timeframe}")
+
+    def warm_start_candles(self, symbol, timeframe, candles, limit=100):
         try:
-            if len(df) < 7:
+            now = int(self.clock.time())
+            step = interval_seconds(timeframe)
+            archived = self.candle_archive.tail(symbol, timeframe, limit, end=now - step)
+            if len(archived['time']):
+                candles.merge_rows(CandleArchive.to_rows(archived))
+                self.candle_sync.prime(symbol, timeframe, int(archived['time'][-1]))
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.warm_start_candles] Mum arşivinden yüklenemedi: {e}. Sembol: {symbol}, Zaman Aralığı: {timeframe}")
+
+    def calculate_indicators(self, candles, symbol=None, timeframe='15m'):
+        try:
+            if len(candles) < 7:
                 self.logger.error("Yetersiz veri: En az 7 mum gerekli")
                 self.send_telegram_message("Hata: Yetersiz veri, en az 7 mum gerekli")
                 return None
-            df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=6).rsi()
-            df['ma7'] = df['close'].rolling(window=7).mean()
-            df['ma7_distance'] = (df['close'] - df['ma7']) / df['ma7']
-            bollinger = ta.volatility.BollingerBands(df['close'], window=20, window_dev=2)
-            df['bollinger_hband'] = bollinger.bollinger_hband()
-            df['bollinger_lband'] = bollinger.bollinger_lband()
-            df['volatility'] = df['close'].pct_change().rolling(window=20).std() * 100
-            return df
+            key = (symbol or self.symbol, timeframe)
+            engine = self.indicator_engines.get(key)
+            if engine is None:
+                engine = IndicatorEngine()
+                self.indicator_engines[key] = engine
+            with self.metrics.timer("indicators"):
+                engine.sync(*candles.series('close'))
+                return engine.snapshot()
         except Exception as e:
             self.logger.error(f"[logic.py:BotLogic.calculate_indicators] Indikatör hesaplama hatası: {e}")
             self.send_telegram_message(f"Hata: Indikatör hesaplama hatası: {e}")
             return None
 
+    def run_cycle(self, timeframe='15m'):
+        if not self.mum_sonu_bekle:
+            self.candle_scheduler.reset(timeframe)
+            self.trade_logic()
+            return
+        if self.candle_scheduler.due(timeframe):
+            self.trade_logic()
+
+    def snapshot(self):
+        return {
+            'time': self.clock.time(),
+            'bot_running': self.bot_running,
+            'symbol': self.symbol,
+            'balance': self.balance or 0,
+            'has_position': bool(len(self.portfolio)),
+            'position_profit': self.portfolio.total_profit(),
+            'positions': self.portfolio.snapshot(),
+            'last_price': self.last_price or 0,
+            'last_rsi': self.last_rsi or 0,
+            'last_ma7_distance': self.last_ma7_distance or 0,
+            'last_trade_profit': self.last_trade_profit or 0,
+            'btc_price': self.btc_price or 0,
+            'eth_price': self.eth_price or 0,
+            'mum_sonu_bekle': self.mum_sonu_bekle,
+            'seconds_to_candle_close': int(self.seconds_to_candle_close('15m')),
+            'long_basarili': self.long_basarili,
+            'long_basarisiz': self.long_basarisiz,
+            'short_basarili': self.short_basarili,
+            'short_basarisiz': self.short_basarisiz,
+        }
+
+    def seconds_to_candle_close(self, timeframe='15m'):
+        return self.candle_scheduler.seconds_to_close(timeframe)
+
     def update_data(self):
-        if not self.check_symbol_exists(self.symbol):
+        self.flush_error_digest()
+        prices = {
+            'btc_price': self.io_pool.submit(self.fetch_last_price, "BTC_USDT"),
+            'eth_price': self.io_pool.submit(self.fetch_last_price, "ETH_USDT"),
+        }
+        balance = self.io_pool.submit(self.get_balance)
+        symbol_exists = self.check_symbol_exists(self.symbol)
+        candles = self.fetch_ohlcv(self.symbol) if symbol_exists else None
+        for name, future in prices.items():
+            try:
+                price = future.result()
+                if price:
+                    setattr(self, name, price)
+            except Exception as e:
+                self.report_error("update_data", f"[logic.py:BotLogic.update_data] BTC/ETH fiyatları alınamadı: {e}", f"Hata: BTC/ETH fiyatları alınamadı: {e}", e)
+        self.balance = balance.result()
+
+        if not symbol_exists:
             self.logger.error(f"Veri güncellenemedi: {self.symbol} sembolü bulunamadı")
             return
-        try:
-            settle = "usdt"
-            btc_candles = self.exchange.list_futures_candlesticks(settle, "BTC_USDT", interval="15m", limit=1)
-            if btc_candles:
-                self.btc_price = float(btc_candles[0].c)
-            eth_candles = self.exchange.list_futures_candlesticks(settle, "ETH_USDT", interval="15m", limit=1)
-            if eth_candles:
-                self.eth_price = float(eth_candles[0].c)
-            self.balance = self.get_balance()
-        except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.update_data] BTC/ETH fiyatları veya bakiye alınamadı: {e}")
-            self.send_telegram_message(f"Hata: BTC/ETH fiyatları veya bakiye alınamadı: {e}")
-
-        df = self.fetch_ohlcv(self.symbol)
-        if df is None:
+        if candles is None:
             self.logger.error("Veri alınamadı, güncelleme yapılmadı")
             return
-        df = self.calculate_indicators(df)
-        if df is None:
+        indicators = self.calculate_indicators(candles)
+        if indicators is None:
             self.logger.error("Indikatörler hesaplanamadı, güncelleme yapılmadı")
             return
-        self.last_price = df['close'].iloc[-1]
-        self.last_rsi = df['rsi'].iloc[-1]
-        self.last_ma7_distance = df['ma7_distance'].iloc[-1] * 100
+        self.last_price = indicators['close']
+        self.last_rsi = indicators['rsi']
+        self.last_ma7_distance = indicators['ma7_distance'] * 100
         self.logger.info(f"Veriler güncellendi: {self.symbol}, Fiyat: {self.last_price:.4f}, RSI: {self.last_rsi:.2f}, MA7 Uzaklık: {self.last_ma7_distance:.2f}%")
 
+    def scan_market(self, symbols=None):
+        try:
+            if self.scanner is None:
+                from scanner import MarketScanner
+                self.scanner = MarketScanner(self, max_workers=8, requests_per_second=15)
+            if symbols is None and self.scan_universe and self.scan_universe.lower() != "all":
+                symbols = [symbol.strip() for symbol in self.scan_universe.split(",") if symbol.strip()]
+            self.last_scan_time = self.clock.time()
+            self.scan_results = self.scanner.scan(symbols)
+            for result in self.scan_results[:5]:
+                self.logger.info(f"Tarama sonucu: {result['symbol']} {result['side']}, Fiyat: {result['price']:.4f}, RSI: {result['rsi']:.2f}, MA7 Uzaklık: {result['ma7_distance']:.2f}%")
+            return self.scan_results
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.scan_market] Piyasa taraması yapılamadı: {e}")
+            return []
+
+    def run_backtest(self, symbol=None, timeframe='15m', limit=2000, initial_balance=None, start=None, end=None, offline=False):
+        symbol = symbol or self.symbol
+        try:
+            if not offline:
+                history_start = start if start is not None else int(self.clock.time()) - limit * interval_seconds(timeframe)
+                self.candle_archive.sync(symbol, timeframe, self.fetch_candle_rows, start=history_start)
+            if start is None and end is None:
+                data = self.candle_archive.tail(symbol, timeframe, limit)
+            else:
+                data = self.candle_archive.read(symbol, timeframe, start, end)
+            if not len(data['time']):
+                self.logger.error(f"Backtest için veri alınamadı: {symbol} {timeframe}")
+                return None
+            timestamps, high, low, close = data['time'], data['high'], data['low'], data['close']
+            from backtester import Backtester
+            backtester = Backtester(self.long_settings, self.short_settings, initial_balance or self.balance or 100.0)
+            result = backtester.run(timestamps, high, low, close, self.disable_position)
+            self.logger.info(
+                f"Backtest sonucu: {symbol} {timeframe}, LONG {result['long_basarili']}/{result['long_basarisiz']}, "
+                f"SHORT {result['short_basarili']}/{result['short_basarisiz']}, Kar/Zarar: {result['pnl']:.2f} USDT"
+            )
+            return result
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.run_backtest] Backtest çalıştırılamadı: {e}")
+            return None
+
     def trade_logic(self):
         if not self.bot_running:
             return
-        self.update_data()
-        current_hour = datetime.now().hour
-        if self.disable_position != "Long" and not self.current_long_position and current_hour in self.long_settings['allowed_hours']:
-            settings = self.long_settings
-            if (self.last_rsi < settings['rsi_threshold'] if settings['rsi_condition'] == 'Küçüktür' else self.last_rsi > settings['rsi_threshold']) and \
-               self.last_ma7_distance < -settings['ma7_threshold'] * 100:
-                self.open_position('LONG')
-        if self.disable_position != "Short" and not self.current_short_position and current_hour in self.short_settings['allowed_hours']:
-            settings = self.short_settings
-            if (self.last_rsi > settings['rsi_threshold'] if settings['rsi_condition'] == 'Büyüktür' else self.last_rsi < settings['rsi_threshold']) and \
-               self.last_ma7_distance > settings['ma7_threshold'] * 100:
-                self.open_position('SHORT')
-
-    def open_position(self, position_type):
+        if self.scan_universe and self.clock.time() - self.last_scan_time >= self.scan_interval and not (self.scan_thread and self.scan_thread.is_alive()):
+            self.last_scan_time = self.clock.time()
+            self.scan_thread = threading.Thread(target=self.scan_market, name="MarketScan", daemon=True)
+            self.scan_thread.start()
+        with self.metrics.timer("update_data"):
+            self.update_data()
+        current_hour = self.clock.now().hour
+        if self.disable_position != "Long" and not self.portfolio.has(self.symbol, 'LONG') and current_hour in self.long_settings['allowed_hours']:
+            signal_time = time.perf_counter()
+            with self.metrics.timer("signal", side="long"):
+                signal = long_signal(self.long_settings, self.last_rsi, self.last_ma7_distance)
+            if signal:
+                self.open_position('LONG', signal_time=signal_time)
+        if self.disable_position != "Short" and not self.portfolio.has(self.symbol, 'SHORT') and current_hour in self.short_settings['allowed_hours']:
+            signal_time = time.perf_counter()
+            with self.metrics.timer("signal", side="short"):
+                signal = short_signal(self.short_settings, self.last_rsi, self.last_ma7_distance)
+            if signal:
+                self.open_position('SHORT', signal_time=signal_time)
+
+    def open_position(self, position_type, symbol=None, price=None, signal_time=None):
+        symbol = symbol or self.symbol
+        price = price or self.last_price
         try:
-            settle = "usdt"
             settings = self.long_settings if position_type == 'LONG' else self.short_settings
-            self.exchange.update_position_leverage(settle, self.symbol, str(settings['leverage']))
-            self.balance = self.get_balance()
+            if self.portfolio.has(symbol, position_type):
+                self.logger.warning(f"{symbol} için zaten açık bir {position_type} pozisyon var")
+                return False
+            if symbol in self.stale_exit_orders:
+                self.cancel_stale_exit_orders()
+                if symbol in self.stale_exit_orders:
+                    self.logger.warning(f"{symbol} için iptal edilemeyen eski TP/SL tetik emirleri var, pozisyon açılmadı")
+                    return False
+            self.order_gateway.ensure_leverage(symbol, settings['leverage'])
+            self.balance = self.order_gateway.available_balance()
             if self.balance < 5:
                 self.logger.warning("Bakiye yetersiz, işlem açılamadı. Minimum 5 USDT gerekli")
                 self.send_telegram_message("Hata: Bakiye yetersiz, minimum 5 USDT gerekli")
@@ -311,167 +544,272 @@ class BotLogic:
 
             leverage = settings['leverage']
             position_value = self.balance * 0.9 * leverage
-            order_size = int(position_value / self.last_price)
+            order_size = int(position_value / price)
             order_size = order_size if position_type == 'LONG' else -order_size
 
-            order = FuturesOrder(contract=self.symbol, size=order_size, price="0", tif='ioc')
-            order_response = self.exchange.create_futures_order(settle, order)
+            order_response = self.order_gateway.submit(symbol, order_size, action="open")
+            if signal_time is not None:
+                self.metrics.observe("signal_to_order", time.perf_counter() - signal_time)
             self.logger.info(f"{position_type} pozisyon emri: ID {order_response.id}, Durum: {order_response.status}, Miktar: {order_response.size}, Kalan: {order_response.left}")
             if order_response.status == 'finished' and order_response.left == 0:
                 self.logger.info(f"{position_type} pozisyon başarıyla açıldı")
                 self.play_sound("islemegirdi.wav")
                 self.send_telegram_message(
-                    f"{position_type} pozisyon açıldı!\nSembol: {self.symbol}\nFiyat: {self.last_price:.4f}\nKaldıraç: {leverage}x\nBakiye: {self.balance:.2f} USDT\nPozisyon Değeri: {position_value:.2f} USDT"
+                    f"{position_type} pozisyon açıldı!\nSembol: {symbol}\nFiyat: {price:.4f}\nKaldıraç: {leverage}x\nBakiye: {self.balance:.2f} USDT\nPozisyon Değeri: {position_value:.2f} USDT"
                 )
             else:
                 self.logger.warning(f"{position_type} pozisyon açılamadı, Durum: {order_response.status}, Kalan: {order_response.left}")
                 self.send_telegram_message(f"Hata: {position_type} pozisyon açılamadı, Durum: {order_response.status}")
                 return False
 
-            tp_price = self.last_price * (1 + settings['tp_percent']) if position_type == 'LONG' else self.last_price * (1 - settings['tp_percent'])
-            sl_price = self.last_price * (1 - settings['sl_percent']) if position_type == 'LONG' else self.last_price * (1 + settings['sl_percent'])
-            self.logger.info(f"{position_type} pozisyon açıldı. Fiyat: {self.last_price}, TP: {tp_price}, SL: {sl_price}, Kaldıraç: {leverage}x")
-            if position_type == 'LONG':
-                self.current_long_position = {'entry_price': self.last_price, 'size': order_size}
-            else:
-                self.current_short_position = {'entry_price': self.last_price, 'size': order_size}
-            self.position_entry_price = self.last_price
-            monitor_thread = threading.Thread(target=self.monitor_position, args=(position_type, tp_price, sl_price, order_size))
-            if position_type == 'LONG':
-                self.monitor_thread_long = monitor_thread
-            else:
-                self.monitor_thread_short = monitor_thread
-            monitor_thread.start()
+            tp_price = price * (1 + settings['tp_percent']) if position_type == 'LONG' else price * (1 - settings['tp_percent'])
+            sl_price = price * (1 - settings['sl_percent']) if position_type == 'LONG' else price * (1 + settings['sl_percent'])
+            self.logger.info(f"{position_type} pozisyon açıldı. Sembol: {symbol}, Fiyat: {price}, TP: {tp_price}, SL: {sl_price}, Kaldıraç: {leverage}x")
+            position = self.portfolio.open(symbol, position_type, price, order_size, leverage, tp_price, sl_price, self.clock.time())
+            if self.exit_orders:
+                spec = self.get_contract_spec(symbol) or {}
+                position.exit_orders = self.exit_orders.place(symbol, position_type, order_size, tp_price, sl_price, spec.get('order_price_round'))
+                if position.exit_orders is None:
+                    self.send_telegram_message(f"Uyarı: {position_type} için borsa tarafı TP/SL emirleri verilemedi, yerel izleme kullanılıyor")
+            self.supervisor.watch(position.key, symbol, self.clock.time() + self.exit_reconcile_interval if position.exit_orders else None)
             return {'tp_price': tp_price, 'sl_price': sl_price, 'order_size': order_size}
         except Exception as e:
             self.logger.error(f"[logic.py:BotLogic.open_position] {position_type} pozisyon açılamadı: {e}")
             self.send_telegram_message(f"Hata: {position_type} pozisyon açılamadı: {e}")
             return False
 
-    def close_position(self, position_type, order_size):
+    def close_position(self, position_type, order_size, symbol=None):
+        symbol = symbol or self.symbol
         settle = "usdt"
         try:
             close_size = -order_size if position_type == 'LONG' else abs(order_size)
-            order = FuturesOrder(contract=self.symbol, size=close_size, price="0", tif='ioc')
-            response = self.exchange.create_futures_order(settle, order)
+            response = self.order_gateway.submit(symbol, close_size, action="close")
             self.logger.info(f"{position_type} pozisyon kapatma emri: ID {response.id}, Durum: {response.status}, Miktar: {response.size}")
-            position = self.exchange.get_position(settle, self.symbol)
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.close_position] {position_type} pozisyon kapatılamadı: {e}")
+            self.send_telegram_message(f"Hata: {position_type} pozisyon kapatılamadı: {e}")
+            return False
+        try:
+            position = self.exchange.get_position(settle, symbol)
             if position.size == 0:
                 self.logger.info(f"{position_type} pozisyon tamamen kapatıldı")
-                self.send_telegram_message(f"{position_type} pozisyon kapatıldı!\nSembol: {self.symbol}\nBakiye: {self.balance:.2f} USDT")
+                self.send_telegram_message(f"{position_type} pozisyon kapatıldı!\nSembol: {symbol}\nBakiye: {self.balance:.2f} USDT")
             else:
                 self.logger.warning(f"{position_type} pozisyon hala açık: Kalan miktar {position.size}")
                 self.send_telegram_message(f"Uyarı: {position_type} pozisyon hala açık, kalan miktar: {position.size}")
-            return response
         except Exception as e:
-            self.logger.error(f"[logic.py:BotLogic.close_position] {position_type} pozisyon kapatılamadı: {e}")
-            self.send_telegram_message(f"Hata: {position_type} pozisyon kapatılamadı: {e}")
+            self.logger.warning(f"[logic.py:BotLogic.close_position] {position_type} kapatma emri verildi ama pozisyon doğrulanamadı: {e}")
+        return response
+
+    def finish_position(self, position, reason, close_order=True):
+        position_type = position.side
+        if not self.portfolio.has(position.symbol, position_type):
+            return True
+        if close_order and not self.close_position(position_type, position.size, position.symbol):
+            # Pozisyon borsada hâlâ açık; portföyde kalır ve kapatma bir süre sonra yeniden denenir
+            position.close_retry_at = self.clock.time() + self.close_retry_delay
+            return False
+        if self.portfolio.close(position.symbol, position_type) is None:
+            return True
+        settings = self.long_settings if position_type == 'LONG' else self.short_settings
+        leverage = settings['leverage']
+        if reason == 'TP':
+            result = self.balance * settings['tp_percent'] * (leverage / 15)
+            counter = f"{position_type.lower()}_basarili"
+        else:
+            result = -self.balance * settings['sl_percent'] * (leverage / 15)
+            counter = f"{position_type.lower()}_basarisiz"
+        setattr(self, counter, getattr(self, counter) + 1)
+        self.logger.info(f"{position_type} pozisyon kapatıldı. Sembol: {position.symbol}, Sebep: {reason}, Kar/Zarar: {result:.2f} USDT, Yeni Bakiye: {self.balance + result:.2f} USDT")
+        position.profit = result
+        self.last_trade_profit += result
+        self.balance += result
+        self.play_sound("islemkapandi.wav")
+        self.send_telegram_message(
+            f"{position_type} pozisyon kapatıldı!\nSembol: {position.symbol}\nSebep: {'Take Profit' if reason == 'TP' else 'Stop Loss'}\nKar/Zarar: {result:.2f} USDT\nYeni Bakiye: {self.balance:.2f} USDT"
+        )
+        return True
+
+    def reconcile_exit_orders(self, position):
+        orders = position.exit_orders
+        if not orders:
+            return False
+        try:
+            statuses = self.exit_orders.status(orders)
+            filled = next((label.upper() for label, (status, finish_as) in statuses.items() if status == 'finished' and finish_as == 'succeeded'), None)
+            if filled:
+                self.retire_exit_orders(orders, keep=filled.lower())
+                self.logger.info(f"{position.symbol} {position.side} pozisyon borsa tarafında {filled} tetik emriyle kapandı")
+                self.finish_position(position, filled, close_order=False)
+                return True
+            if statuses and not any(status == 'open' for status, _ in statuses.values()):
+                self.logger.warning(f"{position.symbol} {position.side} borsa tarafı TP/SL emirleri artık açık değil ({statuses}), yerel izlemeye geçiliyor")
+                self.send_telegram_message(f"Uyarı: {position.symbol} {position.side} borsa tarafı TP/SL emirleri kapandı, yerel izlemeye geçildi")
+                position.exit_orders = None
+            return False
+        except Exception as e:
+            self.report_error("reconcile_exit_orders", f"[logic.py:BotLogic.reconcile_exit_orders] {position.side} tetik emirleri kontrol edilemedi: {e}", f"Hata: {position.side} tetik emirleri kontrol edilemedi: {e}", e)
             return False
 
-    def monitor_position(self, position_type, tp_price, sl_price, order_size):
-        settle = "usdt"
-        current_position_attr = 'current_long_position' if position_type == 'LONG' else 'current_short_position'
+    def refresh_exit_orders(self, position_type):
         settings = self.long_settings if position_type == 'LONG' else self.short_settings
-        while self.bot_running and getattr(self, current_position_attr):
-            df = self.fetch_ohlcv(self.symbol)
-            if df is None:
-                time.sleep(3)
+        for position in self.portfolio.select(side=position_type):
+            if not position.exit_orders:
                 continue
-            current_price = df['close'].iloc[-1]
-            leverage = settings['leverage']
-            if position_type == 'LONG':
-                self.position_profit = (current_price - self.position_entry_price) * order_size * leverage
-            else:
-                self.position_profit = (self.position_entry_price - current_price) * abs(order_size) * leverage
-
-            if position_type == 'LONG':
-                if current_price >= tp_price:
-                    profit = self.balance * settings['tp_percent'] * (leverage / 15)
-                    self.long_basarili += 1
-                    self.logger.info(f"LONG pozisyon kapatıldı. Sebep: TP, Kar/Zarar: {profit:.2f} USDT, Yeni Bakiye: {self.balance + profit:.2f} USDT")
-                    self.position_profit = profit
-                    self.last_trade_profit += profit
-                    self.balance += profit
-                    self.close_position(position_type, order_size)
-                    self.play_sound("islemkapandi.wav")
-                    self.send_telegram_message(
-                        f"LONG pozisyon kapatıldı!\nSebep: Take Profit\nKar/Zarar: {profit:.2f} USDT\nYeni Bakiye: {self.balance:.2f} USDT"
-                    )
-                    self.current_long_position = None
-                    break
-                elif current_price <= sl_price:
-                    loss = -self.balance * settings['sl_percent'] * (leverage / 15)
-                    self.long_basarisiz += 1
-                    self.logger.info(f"LONG pozisyon kapatıldı. Sebep: SL, Kar/Zarar: {loss:.2f} USDT, Yeni Bakiye: {self.balance + loss:.2f} USDT")
-                    self.position_profit = loss
-                    self.last_trade_profit += loss
-                    self.balance += loss
-                    self.close_position(position_type, order_size)
-                    self.play_sound("islemkapandi.wav")
-                    self.send_telegram_message(
-                        f"LONG pozisyon kapatıldı!\nSebep: Stop Loss\nKar/Zarar: {loss:.2f} USDT\nYeni Bakiye: {self.balance:.2f} USDT"
-                    )
-                    self.current_long_position = None
-                    break
-            else:
-                if current_price <= tp_price:
-                    profit = self.balance * settings['tp_percent'] * (leverage / 15)
-                    self.short_basarili += 1
-                    self.logger.info(f"SHORT pozisyon kapatıldı. Sebep: TP, Kar/Zarar: {profit:.2f} USDT, Yeni Bakiye: {self.balance + profit:.2f} USDT")
-                    self.position_profit = profit
-                    self.last_trade_profit += profit
-                    self.balance += profit
-                    self.close_position(position_type, order_size)
-                    self.play_sound("islemkapandi.wav")
-                    self.send_telegram_message(
-                        f"SHORT pozisyon kapatıldı!\nSebep: Take Profit\nKar/Zarar: {profit:.2f} USDT\nYeni Bakiye: {self.balance:.2f} USDT"
-                    )
-                    self.current_short_position = None
-                    break
-                elif current_price >= sl_price:
-                    loss = -self.balance * settings['sl_percent'] * (leverage / 15)
-                    self.short_basarisiz += 1
-                    self.logger.info(f"SHORT pozisyon kapatıldı. Sebep: SL, Kar/Zarar: {loss:.2f} USDT, Yeni Bakiye: {self.balance + loss:.2f} USDT")
-                    self.position_profit = loss
-                    self.last_trade_profit += loss
-                    self.balance += loss
-                    self.close_position(position_type, order_size)
-                    self.play_sound("islemkapandi.wav")
-                    self.send_telegram_message(
-                        f"SHORT pozisyon kapatıldı!\nSebep: Stop Loss\nKar/Zarar: {loss:.2f} USDT\nYeni Bakiye: {self.balance:.2f} USDT"
-                    )
-                    self.current_short_position = None
-                    break
-            time.sleep(3)
+            entry = position.entry_price
+            tp_price = entry * (1 + settings['tp_percent']) if position_type == 'LONG' else entry * (1 - settings['tp_percent'])
+            sl_price = entry * (1 - settings['sl_percent']) if position_type == 'LONG' else entry * (1 + settings['sl_percent'])
+            if tp_price == position.tp_price and sl_price == position.sl_price:
+                continue
+            old_orders = position.exit_orders
+            spec = self.get_contract_spec(position.symbol) or {}
+            # Yeni emirler eskiler iptal edilmeden önce verilir; pozisyon hiçbir an korumasız kalmaz
+            orders = self.exit_orders.place(position.symbol, position_type, position.size, tp_price, sl_price, spec.get('order_price_round'))
+            if orders is None:
+                self.send_telegram_message(f"Uyarı: {position.symbol} {position_type} TP/SL emirleri güncellenemedi, eski emirler korunuyor")
+                continue
+            self.retire_exit_orders(old_orders)
+            self.portfolio.update(position.symbol, position_type, exit_orders=orders, tp_price=tp_price, sl_price=sl_price)
+            self.logger.info(f"{position.symbol} {position_type} TP/SL emirleri güncellendi: TP {tp_price}, SL {sl_price}")
+
+    def retire_exit_orders(self, orders, keep=None):
+        if not self.exit_orders.cancel(orders, keep=keep):
+            # İptali doğrulanamayan tetik emri aynı kontrattaki yeni bir pozisyonu kapatabilir; iptal yeniden denenir
+            with self.stale_exit_lock:
+                pending = self.stale_exit_orders.setdefault(orders['contract'], [])
+                if orders not in pending:
+                    pending.append(orders)
+
+    def cancel_stale_exit_orders(self):
+        with self.stale_exit_lock:
+            for contract, pending in list(self.stale_exit_orders.items()):
+                for orders in list(pending):
+                    try:
+                        self.exit_orders.cancel(orders)
+                        if not any(status == 'open' for status, _ in self.exit_orders.status(orders).values()):
+                            pending.remove(orders)
+                    except Exception as e:
+                        self.report_error("cancel_stale_exit_orders", f"[logic.py:BotLogic.cancel_stale_exit_orders] {contract} eski tetik emirleri iptal edilemedi: {e}", f"Hata: {contract} eski TP/SL tetik emirleri iptal edilemedi: {e}", e)
+                if not pending:
+                    del self.stale_exit_orders[contract]
+
+    def cancel_orphan_exit_orders(self):
+        try:
+            tracked = {order_id for position in self.portfolio.select() if position.exit_orders
+                       for order_id in (position.exit_orders['tp'], position.exit_orders['sl']) if order_id is not None}
+            orphans = self.exit_orders.open_orders(exclude=tracked)
+            if not orphans:
+                return
+            with self.stale_exit_lock:
+                for orders in orphans:
+                    self.stale_exit_orders.setdefault(orders['contract'], []).append(orders)
+            self.logger.warning(f"Önceki çalışmadan kalan {len(orphans)} TP/SL tetik emri iptal ediliyor: {orphans}")
+            self.send_telegram_message(f"Uyarı: Önceki çalışmadan kalan {len(orphans)} TP/SL tetik emri iptal ediliyor")
+            self.cancel_stale_exit_orders()
+        except Exception as e:
+            self.logger.error(f"[logic.py:BotLogic.cancel_orphan_exit_orders] Açık tetik emirleri listelenemedi: {e}")
+
+    def exit_locally(self, position):
+        self.logger.warning(f"{position.symbol} {position.side} {position.crossed_reason} seviyesi {self.exit_grace:.0f} saniyedir aşılmış ama borsa emri tetiklenmedi, yerel kapatma yapılıyor")
+        self.retire_exit_orders(position.exit_orders)
+        if self.reconcile_exit_orders(position):
+            return True
+        position.exit_orders = None
+        return self.finish_position(position, position.crossed_reason)
+
+    def on_position_tick(self, key, tick):
+        position = self.portfolio.get(*key)
+        if not self.bot_running or not position:
+            return True
+        current_price = tick['last']
+        position.mark(current_price)
+        if position.close_retry_at is not None and self.clock.time() < position.close_retry_at:
+            return False
+        if position.side == 'LONG':
+            reason = 'TP' if current_price >= position.tp_price else 'SL' if current_price <= position.sl_price else None
+        else:
+            reason = 'TP' if current_price <= position.tp_price else 'SL' if current_price >= position.sl_price else None
+        if reason is None:
+            position.crossed_reason = position.crossed_at = None
+            return False
+        if position.exit_orders and self.reconcile_exit_orders(position):
+            return True
+        if position.exit_orders:
+            if position.crossed_reason != reason:
+                position.crossed_reason, position.crossed_at = reason, self.clock.time()
+                self.supervisor.schedule(key, position.crossed_at + self.exit_grace)
+            if self.clock.time() - position.crossed_at < self.exit_grace:
+                return False
+            return self.exit_locally(position)
+        return self.finish_position(position, reason)
+
+    def on_position_timer(self, key):
+        position = self.portfolio.get(*key)
+        if not self.bot_running or not position:
+            return True
+        if not position.exit_orders:
+            return False
+        if self.reconcile_exit_orders(position):
+            return True
+        if position.exit_orders and position.crossed_at is not None and self.clock.time() - position.crossed_at >= self.exit_grace:
+            return self.exit_locally(position)
+        if position.exit_orders:
+            self.supervisor.schedule(key, self.clock.time() + self.exit_reconcile_interval)
+        return False
+
+    def start_market_stream(self):
+        if self.market_stream is None:
+            from market_stream import MarketStream, GATE_FUTURES_WS_URL
+            self.market_stream_url = self.market_stream_url or GATE_FUTURES_WS_URL
+            self.market_stream = MarketStream(self.candle_store, self.price_feed, url=self.market_stream_url)
+        self.stream_symbol(self.symbol)
+        if self.market_stream.start():
+            self.logger.info(f"Piyasa verisi akışı başlatıldı: {self.market_stream_url}")
+
+    def stream_symbol(self, symbol, timeframe='15m'):
+        if self.market_stream:
+            self.market_stream.subscribe_candles(symbol, timeframe)
+            self.market_stream.subscribe_ticker(symbol)
 
     def start_bot(self):
         self.bot_running = True
+        if self.exit_orders:
+            self.cancel_orphan_exit_orders()
+        if self.streaming_enabled:
+            self.start_market_stream()
         self.play_sound("Bot_basladi.wav")
         self.logger.info("Bot başlatıldı")
         self.send_telegram_message(f"Bot başlatıldı!\nSembol: {self.symbol}\nBakiye: {self.balance:.2f} USDT")
 
     def stop_bot(self):
         self.bot_running = False
+        for position in self.portfolio.select():
+            if position.exit_orders:
+                self.logger.info(f"{position.symbol} {position.side} pozisyonun borsa tarafı TP/SL emirleri açık bırakıldı, sonraki başlatmada iptal edilecek: {position.exit_orders}")
+        self.supervisor.stop()
+        self.price_feed.stop()
         self.found_symbol = None
-        self.current_long_position = None
-        self.current_short_position = None
-        if self.monitor_thread_long:
-            self.monitor_thread_long.join()
-        if self.monitor_thread_short:
-            self.monitor_thread_short.join()
+        self.portfolio.clear()
         self.logger.info("Bot durduruldu")
         self.send_telegram_message("Bot durduruldu")
 
     def update_long_settings(self, **kwargs):
-        self.long_settings.update(kwargs)
+        # Sözlük yerinde değiştirilmez; denetçi iş parçacığı her zaman tutarlı bir ayar kümesi okur
+        self.long_settings = {**self.long_settings, **kwargs}
         self.symbol = self.long_settings['symbol']
         self.found_symbol = None
+        self.stream_symbol(self.symbol)
+        self.refresh_exit_orders('LONG')
+        self.warm_order_gateway()
         self.logger.info(f"Long ayarları güncellendi: {self.long_settings}")
 
     def update_short_settings(self, **kwargs):
-        self.short_settings.update(kwargs)
+        self.short_settings = {**self.short_settings, **kwargs}
         self.symbol = self.short_settings['symbol']
         self.found_symbol = None
+        self.stream_symbol(self.symbol)
+        self.refresh_exit_orders('SHORT')
+        self.warm_order_gateway()
         self.logger.info(f"Short ayarları güncellendi: {self.short_settings}")
 
     def set_data_source(self, source):
@@ -490,5 +828,5 @@ class BotLogic:
         self.send_telegram_message(f"Devre Dışı Bırakma Ayarı: {value}")
 
 if __name__ == "__main__":
-    bot = BotLogic()
-    bot.start_bot()
\ No newline at end of file
+    from daemon import main
+    main()
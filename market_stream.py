@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+import logging
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+GATE_FUTURES_WS_URL = "wss://fx-ws.gateio.ws/v4/ws/usdt"
+
+
+class MarketStream:
+    def __init__(self, candle_store, price_feed, url=GATE_FUTURES_WS_URL, reconnect_delay=1, max_reconnect_delay=30, ping_interval=20, record_file=None):
+        self.candle_store = candle_store
+        self.price_feed = price_feed
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.record_file = record_file
+        self.logger = logging.getLogger('BotLogger')
+        self.subscriptions = set()
+        self.synced = {}
+        self.epoch = 0
+        self.connected = False
+        self.ws = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._record = None
+
+    def subscribe_candles(self, symbol, interval):
+        self._subscribe('futures.candlesticks', (interval, symbol))
+
+    def subscribe_ticker(self, symbol):
+        self._subscribe('futures.tickers', (symbol,))
+
+    def is_streaming(self, symbol, interval):
+        # Abonelik ve her yeniden bağlantıdan sonra tampon REST ile tamamlanana kadar akış tek kaynak sayılmaz
+        return self.connected and self.synced.get((symbol, interval)) == self.epoch
+
+    def mark_synced(self, symbol, interval, epoch):
+        if ('futures.candlesticks', (interval, symbol)) in self.subscriptions:
+            self.synced[(symbol, interval)] = epoch
+
+    def _subscribe(self, channel, payload):
+        with self._lock:
+            if (channel, payload) in self.subscriptions:
+                return
+            self.subscriptions.add((channel, payload))
+        if self.connected:
+            self._send(self.ws, channel, payload)
+            if channel == 'futures.tickers':
+                self.price_feed.set_polling(False, contracts=payload)
+
+    def _send(self, ws, channel, payload, event='subscribe'):
+        try:
+            ws.send(json.dumps({'time': int(time.time()), 'channel': channel, 'event': event, 'payload': list(payload)}))
+        except Exception as e:
+            self.logger.error(f"[market_stream.py:MarketStream._send] Abonelik gönderilemedi: {channel} {payload}: {e}")
+
+    def start(self):
+        if websocket is None:
+            self.logger.error("[market_stream.py:MarketStream.start] websocket-client yüklü değil, akış başlatılamadı")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        if self.record_file:
+            self._record = open(self.record_file, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="MarketStream", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self.ws:
+            self.ws.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._record:
+            self._record.close()
+            self._record = None
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            self.ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            opened_at = time.monotonic()
+            try:
+                self.ws.run_forever(ping_interval=self.ping_interval, ping_timeout=self.ping_interval / 2)
+            except Exception as e:
+                self.logger.error(f"[market_stream.py:MarketStream._run] WebSocket hatası: {e}")
+            self.connected = False
+            self.price_feed.set_polling(True)
+            if self._stop.is_set():
+                break
+            if time.monotonic() - opened_at > self.max_reconnect_delay:
+                delay = self.reconnect_delay
+            self.logger.warning(f"WebSocket bağlantısı koptu, {delay} saniye sonra yeniden bağlanılacak")
+            self._stop.wait(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _on_open(self, ws):
+        self.epoch += 1
+        self.connected = True
+        with self._lock:
+            subscriptions = list(self.subscriptions)
+        # Ticker aboneliği olmayan kontratların fiyatı REST yoklamasıyla gelmeye devam eder
+        self.price_feed.set_polling(False, contracts=[payload[0] for channel, payload in subscriptions if channel == 'futures.tickers'])
+        for channel, payload in subscriptions:
+            self._send(ws, channel, payload)
+        self.logger.info(f"WebSocket bağlandı: {self.url}, {len(subscriptions)} abonelik")
+
+    def _on_message(self, ws, message):
+        if self._record:
+            self._record.write(message + "\n")
+        try:
+            self.handle_message(json.loads(message))
+        except Exception as e:
+            self.logger.error(f"[market_stream.py:MarketStream._on_message] Mesaj işlenemedi: {e}")
+
+    def _on_error(self, ws, error):
+        self.logger.error(f"[market_stream.py:MarketStream._on_error] WebSocket hatası: {error}")
+
+    def _on_close(self, ws, status_code=None, message=None):
+        self.connected = False
+
+    def handle_message(self, msg):
+        if msg.get('event') != 'update' or not msg.get('result'):
+            return
+        channel = msg.get('channel')
+        result = msg['result']
+        if isinstance(result, dict):
+            result = [result]
+        if channel == 'futures.candlesticks':
+            for item in result:
+                interval, symbol = item['n'].split('_', 1)
+                self.candle_store.get(symbol, interval).merge(
+                    int(item['t']), float(item['o']), float(item['h']), float(item['l']), float(item['c']), float(item['v'])
+                )
+        elif channel == 'futures.tickers':
+            for item in result:
+                last = float(item['last'])
+                self.price_feed.publish(item['contract'], last, float(item.get('mark_price') or last))
@@ -0,0 +1,187 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    def __init__(self, sub_bucket_bits=7):
+        # Log-doğrusal kovalar (HDR tarzı): her ikinin kuvveti 2^sub_bucket_bits alt kovaya bölünür, bağıl hata < %1
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, micros):
+        shift = max(0, micros.bit_length() - self.sub_bucket_bits)
+        return (micros >> shift) << shift
+
+    def record(self, seconds):
+        seconds = max(0.0, float(seconds))
+        bucket = self._bucket(max(1, int(seconds * 1e6)))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                width = 1 << max(0, bucket.bit_length() - self.sub_bucket_bits)
+                return min((bucket + (width - 1) / 2) / 1e6, self.max)
+        return self.max
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+
+
+class Metrics:
+    def __init__(self, prefix="bot"):
+        self.prefix = prefix
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds, **labels):
+        key = (stage, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.increment("errors", stage=stage, **labels)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def summary(self):
+        with self._lock:
+            rows = []
+            for (stage, labels), histogram in sorted(self.histograms.items()):
+                rows.append({
+                    'stage': stage,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'mean': histogram.total / histogram.count if histogram.count else 0.0,
+                    'p50': histogram.percentile(0.5),
+                    'p99': histogram.percentile(0.99),
+                    'max': histogram.max,
+                })
+            return rows
+
+    def counter_summary(self):
+        with self._lock:
+            return [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(self.counters.items())]
+
+    def render(self):
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Aşama gecikmeleri (saniye)", f"# TYPE {name} summary"]
+        with self._lock:
+            for (stage, labels), histogram in sorted(self.histograms.items()):
+                base = (('stage', stage),) + labels
+                for q in QUANTILES:
+                    lines.append(f"{name}{{{_labels(base + (('quantile', q),))}}} {histogram.percentile(q):.6f}")
+                lines.append(f"{name}_sum{{{_labels(base)}}} {histogram.total:.6f}")
+                lines.append(f"{name}_count{{{_labels(base)}}} {histogram.count}")
+            lines.append(f"# TYPE {self.prefix}_stage_max_seconds gauge")
+            for (stage, labels), histogram in sorted(self.histograms.items()):
+                lines.append(f"{self.prefix}_stage_max_seconds{{{_labels((('stage', stage),) + labels)}}} {histogram.max:.6f}")
+            for counter in sorted({counter for counter, _ in self.counters}):
+                lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+                for (key, labels), value in sorted(self.counters.items()):
+                    if key == counter:
+                        lines.append(f"{self.prefix}_{counter}_total{{{_labels(labels)}}} {value}")
+        lines.append(f"# TYPE {self.prefix}_uptime_seconds gauge")
+        lines.append(f"{self.prefix}_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def format(self):
+        lines = [f"{'Aşama':<44}{'Adet':>7}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for row in self.summary():
+            label = row['stage'] + "".join(f" {value}" for value in row['labels'].values())
+            lines.append(f"{label[:43]:<44}{row['count']:>7}{row['p50'] * 1000:>10.3f}{row['p99'] * 1000:>10.3f}{row['max'] * 1000:>10.3f}")
+        counters = self.counter_summary()
+        if counters:
+            lines.append("")
+            for row in counters:
+                lines.append(f"{row['name']} {' '.join(str(value) for value in row['labels'].values())}: {row['value']}")
+        return "\n".join(lines)
+
+
+class MetricsServer:
+    def __init__(self, metrics, host="127.0.0.1", port=9108):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger('BotLogger')
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+            self._thread.start()
+            self.logger.info(f"Metrik sunucusu başlatıldı: http://{self.host}:{self.port}/metrics")
+            return True
+        except Exception as e:
+            self._server = None
+            self.logger.error(f"[metrics.py:MetricsServer.start] Metrik sunucusu başlatılamadı: {e}")
+            return False
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,245 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+import tempfile
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from indicators import panel_indicators
+from backtester import Backtester
+from candle_archive import CandleArchive
+from candle_sync import interval_seconds
+from strategy import DEFAULT_LONG_SETTINGS, DEFAULT_SHORT_SETTINGS
+
+SWEEP_PARAMETERS = ('rsi_threshold', 'ma7_threshold', 'tp_percent', 'sl_percent')
+RESULT_COLUMNS = ('symbol', 'side') + SWEEP_PARAMETERS + ('trades', 'basarili', 'basarisiz', 'win_rate', 'pnl', 'max_drawdown')
+
+_worker = {}
+
+
+def parameter_grid(space):
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_parameters(space, count, seed=None):
+    rng = random.Random(seed)
+    combos = []
+    for _ in range(count):
+        combo = {}
+        for name, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                combo[name] = round(rng.uniform(*values), 6)
+            else:
+                combo[name] = rng.choice(list(values))
+        combos.append(combo)
+    return combos
+
+
+class SharedCandles:
+    def __init__(self, candles, directory=None):
+        self.offsets = {}
+        total = 0
+        for symbol, (timestamps, *_) in candles.items():
+            self.offsets[symbol] = (total, total + len(timestamps))
+            total += len(timestamps)
+        fd, self.path = tempfile.mkstemp(prefix="sweep_", suffix=".f64", dir=directory)
+        os.close(fd)
+        self.shape = (4, max(total, 1))
+        data = np.memmap(self.path, dtype=np.float64, mode='w+', shape=self.shape)
+        for symbol, columns in candles.items():
+            start, end = self.offsets[symbol]
+            for row, column in enumerate(columns):
+                data[row, start:end] = column
+        data.flush()
+        del data
+
+    def close(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _init_worker(path, shape, offsets, long_settings, short_settings, initial_balance, utc_offset):
+    _worker['data'] = np.memmap(path, dtype=np.float64, mode='r', shape=shape)
+    _worker['offsets'] = offsets
+    _worker['settings'] = {'LONG': long_settings, 'SHORT': short_settings}
+    _worker['initial_balance'] = initial_balance
+    _worker['utc_offset'] = utc_offset
+    _worker['indicators'] = {}
+    logging.getLogger('BotLogger').setLevel(logging.WARNING)
+
+
+def _run_task(symbol, side, combos):
+    start, end = _worker['offsets'][symbol]
+    timestamps, high, low, close = _worker['data'][:, start:end]
+    indicators = _worker['indicators'].get(symbol)
+    if indicators is None:
+        indicators = panel_indicators(close)
+        _worker['indicators'] = {symbol: indicators}
+    rows = []
+    for combo in combos:
+        long_settings = dict(_worker['settings']['LONG'])
+        short_settings = dict(_worker['settings']['SHORT'])
+        (long_settings if side == 'LONG' else short_settings).update(combo)
+        backtester = Backtester(long_settings, short_settings, _worker['initial_balance'], _worker['utc_offset'])
+        result = backtester.run(timestamps, high, low, close, "Short" if side == 'LONG' else "Long", indicators)
+        prefix = side.lower()
+        basarili = result[f'{prefix}_basarili']
+        basarisiz = result[f'{prefix}_basarisiz']
+        settings = long_settings if side == 'LONG' else short_settings
+        row = {'symbol': symbol, 'side': side}
+        row.update({name: settings[name] for name in SWEEP_PARAMETERS})
+        row.update({
+            'trades': basarili + basarisiz,
+            'basarili': basarili,
+            'basarisiz': basarisiz,
+            'win_rate': basarili / (basarili + basarisiz) * 100 if basarili + basarisiz else 0.0,
+            'pnl': result['pnl'],
+            'max_drawdown': result['max_drawdown'],
+        })
+        rows.append(row)
+    return rows
+
+
+class SweepResults:
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def sort(self, column='pnl', descending=True):
+        self.rows.sort(key=lambda row: row[column], reverse=descending)
+        return self
+
+    def best(self, column='pnl', min_trades=1):
+        best = {}
+        for row in self.rows:
+            if row['trades'] < min_trades:
+                continue
+            current = best.get((row['symbol'], row['side']))
+            if current is None or row[column] > current[column]:
+                best[(row['symbol'], row['side'])] = row
+        return SweepResults(best.values()).sort(column)
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+    def format(self, limit=20):
+        lines = [" ".join(f"{column:>13}" for column in RESULT_COLUMNS)]
+        for row in self.rows[:limit]:
+            lines.append(" ".join(f"{row[column]:>13.4f}" if isinstance(row[column], float) else f"{row[column]:>13}" for column in RESULT_COLUMNS))
+        return "\n".join(lines)
+
+
+class ParameterSweep:
+    def __init__(self, long_settings, short_settings, processes=None, initial_balance=100.0, utc_offset=None, tasks_per_process=4):
+        self.long_settings = long_settings
+        self.short_settings = short_settings
+        self.processes = processes or os.cpu_count() or 1
+        self.initial_balance = initial_balance
+        self.utc_offset = time.localtime().tm_gmtoff if utc_offset is None else utc_offset
+        self.tasks_per_process = tasks_per_process
+        self.logger = logging.getLogger('BotLogger')
+
+    def run(self, candles, combos, side='LONG'):
+        started = time.perf_counter()
+        candles = {symbol: columns for symbol, columns in candles.items() if len(columns[0])}
+        if not candles or not combos:
+            return SweepResults()
+        shared = SharedCandles(candles)
+        chunk = max(1, len(combos) * len(candles) // (self.processes * self.tasks_per_process))
+        rows = []
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker,
+                initargs=(shared.path, shared.shape, shared.offsets, self.long_settings, self.short_settings, self.initial_balance, self.utc_offset),
+            ) as pool:
+                futures = [
+                    pool.submit(_run_task, symbol, side, combos[i:i + chunk])
+                    for symbol in candles
+                    for i in range(0, len(combos), chunk)
+                ]
+                for future in as_completed(futures):
+                    try:
+                        rows.extend(future.result())
+                    except Exception as e:
+                        self.logger.error(f"[optimizer.py:ParameterSweep.run] Tarama görevi başarısız: {e}")
+        finally:
+            shared.close()
+        self.logger.info(f"Parametre taraması tamamlandı: {len(candles)} sembol, {len(combos)} kombinasyon, {len(rows)} sonuç, {time.perf_counter() - started:.1f} saniye")
+        return SweepResults(rows).sort()
+
+
+def _parse_space(items):
+    space = {}
+    for item in items or []:
+        name, values = item.split('=', 1)
+        if name not in SWEEP_PARAMETERS:
+            raise ValueError(f"Bilinmeyen parametre: {name}")
+        if ':' in values:
+            low, high = values.split(':', 1)
+            space[name] = (float(low), float(high))
+        else:
+            space[name] = [float(value) for value in values.split(',')]
+    return space
+
+
+def load_candles(symbols, interval='15m', limit=2000, archive_root="candle_archive", offline=False):
+    archive = CandleArchive(archive_root, source="gateio_futures")
+    if not offline:
+        from gate_api import ApiClient, Configuration, FuturesApi
+        from http_transport import shared_transport
+        api = FuturesApi(shared_transport().attach(ApiClient(Configuration())))
+
+        def fetch(symbol, interval, limit=None, start=None, end=None):
+            rows = api.list_futures_candlesticks("usdt", symbol, interval=interval, limit=limit, _from=start, to=end)
+            return [(int(c.t), float(c.o), float(c.h), float(c.l), float(c.c), float(c.v)) for c in rows or []]
+
+    candles = {}
+    for symbol in symbols:
+        if not offline:
+            archive.sync(symbol, interval, fetch, start=int(time.time()) - limit * interval_seconds(interval))
+        data = archive.tail(symbol, interval, limit)
+        candles[symbol] = (data['time'], data['high'], data['low'], data['close'])
+    return candles
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RSI/MA7/TP/SL ayarlarını geçmiş mumlar üzerinde paralel olarak tarar")
+    parser.add_argument("--symbols", required=True, help="Virgülle ayrılmış semboller, örn. DOGE_USDT,XRP_USDT")
+    parser.add_argument("--interval", default="15m")
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--side", choices=("LONG", "SHORT"), default="LONG")
+    parser.add_argument("--param", action="append", help="ad=v1,v2,... (ızgara) veya ad=min:max (rastgele)")
+    parser.add_argument("--random", type=int, default=0, help="Rastgele kombinasyon sayısı (0 ise ızgara)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--sort", default="pnl", choices=RESULT_COLUMNS)
+    parser.add_argument("--best", action="store_true", help="Her sembol için yalnızca en iyi sonucu göster")
+    parser.add_argument("--csv", default=None)
+    parser.add_argument("--archive", default=os.getenv("CANDLE_ARCHIVE_DIR", "candle_archive"), help="Mum arşivi dizini")
+    parser.add_argument("--offline", action="store_true", help="Borsaya bağlanmadan yalnızca yerel arşivi kullan")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    space = _parse_space(args.param)
+    combos = random_parameters(space, args.random, args.seed) if args.random else parameter_grid(space)
+    candles = load_candles([symbol.strip() for symbol in args.symbols.split(",") if symbol.strip()], args.interval, args.limit, args.archive, args.offline)
+    sweep = ParameterSweep(DEFAULT_LONG_SETTINGS, DEFAULT_SHORT_SETTINGS, processes=args.processes)
+    results = sweep.run(candles, combos, args.side)
+    if args.best:
+        results = results.best(args.sort)
+    results.sort(args.sort)
+    print(results.format())
+    if args.csv:
+        results.to_csv(args.csv)
@@ -0,0 +1,103 @@
+import threading
+import time
+import logging
+
+
+class OrderGateway:
+    def __init__(self, exchange, clock, settle="usdt", metrics=None, balance_ttl=30, executor=None):
+        self.exchange = exchange
+        self.clock = clock
+        self.settle = settle
+        self.metrics = metrics
+        self.balance_ttl = balance_ttl
+        self.executor = executor
+        self.logger = logging.getLogger('BotLogger')
+        self.leverage = {}
+        self.balance = None
+        self.balance_at = None
+        self._order_class = None
+        self._refreshing = None
+        self._lock = threading.Lock()
+
+    def set_balance(self, available):
+        with self._lock:
+            self.balance = float(available)
+            self.balance_at = self.clock.time()
+
+    def invalidate_balance(self):
+        with self._lock:
+            self.balance_at = None
+
+    def refresh_balance(self):
+        try:
+            account = self.exchange.list_futures_accounts(self.settle)
+            self.set_balance(account.available)
+        except Exception as e:
+            self.invalidate_balance()
+            self.logger.error(f"[order_gateway.py:OrderGateway.refresh_balance] Bakiye yenilenemedi: {e}")
+
+    def _refresh_after_fill(self):
+        if self.executor is None:
+            self.invalidate_balance()
+            return
+        try:
+            # Emirden sonra bakiye arka planda yenilenir; sonraki giriş emri hesap sorgusunu beklemez
+            self._refreshing = self.executor.submit(self.refresh_balance)
+        except Exception as e:
+            self.invalidate_balance()
+            self.logger.error(f"[order_gateway.py:OrderGateway._refresh_after_fill] Bakiye yenileme başlatılamadı: {e}")
+
+    def available_balance(self):
+        refreshing = self._refreshing
+        if refreshing is not None and not refreshing.done():
+            # Yenileme hâlâ sürüyorsa emir öncesi bakiye yerine onun sonucu kullanılır
+            refreshing.result()
+        with self._lock:
+            fresh = self.balance_at is not None and self.clock.time() - self.balance_at < self.balance_ttl
+            if fresh:
+                return self.balance
+        account = self.exchange.list_futures_accounts(self.settle)
+        self.set_balance(account.available)
+        return self.balance
+
+    def ensure_leverage(self, contract, leverage):
+        leverage = str(leverage)
+        if self.leverage.get(contract) == leverage:
+            return False
+        try:
+            self.exchange.update_position_leverage(self.settle, contract, leverage)
+        except Exception:
+            self.leverage.pop(contract, None)
+            raise
+        self.leverage[contract] = leverage
+        return True
+
+    def _order(self, **fields):
+        if self._order_class is None:
+            from gate_api import FuturesOrder
+            self._order_class = FuturesOrder
+        return self._order_class(**fields)
+
+    def warm(self, targets=()):
+        started = time.perf_counter()
+        try:
+            self._order(contract="", size=0)
+            for contract, leverage in targets:
+                self.ensure_leverage(contract, leverage)
+            self.logger.info(f"Emir geçidi hazır: {dict(self.leverage)} ({time.perf_counter() - started:.2f} sn)")
+        except Exception as e:
+            self.logger.error(f"[order_gateway.py:OrderGateway.warm] Emir geçidi hazırlanamadı: {e}")
+
+    def submit(self, contract, size, action="open", tif='ioc', reduce_only=False):
+        order = self._order(contract=contract, size=size, price="0", tif=tif, reduce_only=reduce_only)
+        started = time.perf_counter()
+        try:
+            return self.exchange.create_futures_order(self.settle, order)
+        except Exception:
+            # Kaldıraç borsada dışarıdan değişmiş olabilir; sonraki emirde yeniden ayarlanır
+            self.leverage.pop(contract, None)
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.observe("order_round_trip", time.perf_counter() - started, action=action)
+            self._refresh_after_fill()
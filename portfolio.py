@@ -0,0 +1,98 @@
+import threading
+
+POSITION_FIELDS = ('symbol', 'side', 'entry_price', 'size', 'leverage', 'tp_price', 'sl_price', 'opened_at')
+
+
+class Position:
+    __slots__ = POSITION_FIELDS + ('last_price', 'profit', 'exit_orders', 'crossed_reason', 'crossed_at', 'close_retry_at')
+
+    def __init__(self, symbol, side, entry_price, size, leverage, tp_price, sl_price, opened_at):
+        self.symbol = symbol
+        self.side = side
+        self.entry_price = entry_price
+        self.size = size
+        self.leverage = leverage
+        self.tp_price = tp_price
+        self.sl_price = sl_price
+        self.opened_at = opened_at
+        self.last_price = entry_price
+        self.profit = 0.0
+        self.exit_orders = None
+        self.crossed_reason = None
+        self.crossed_at = None
+        self.close_retry_at = None
+
+    @property
+    def key(self):
+        return (self.symbol, self.side)
+
+    def mark(self, price):
+        self.last_price = price
+        self.profit = (price - self.entry_price) * self.size * self.leverage
+        return self.profit
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Portfolio:
+    def __init__(self):
+        self.positions = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def open(self, symbol, side, entry_price, size, leverage, tp_price, sl_price, opened_at):
+        with self._lock:
+            if (symbol, side) in self.positions:
+                return None
+            position = Position(symbol, side, entry_price, size, leverage, tp_price, sl_price, opened_at)
+            self.positions[position.key] = position
+            return position
+
+    def get(self, symbol, side):
+        return self.positions.get((symbol, side))
+
+    def has(self, symbol, side):
+        return (symbol, side) in self.positions
+
+    def close(self, symbol, side):
+        with self._lock:
+            return self.positions.pop((symbol, side), None)
+
+    def update(self, symbol, side, **fields):
+        with self._lock:
+            position = self.positions.get((symbol, side))
+            if position is None:
+                return None
+            for name, value in fields.items():
+                setattr(position, name, value)
+            return position
+
+    def select(self, symbol=None, side=None):
+        with self._lock:
+            return [position for position in self.positions.values()
+                    if (symbol is None or position.symbol == symbol) and (side is None or position.side == side)]
+
+    def symbols(self):
+        with self._lock:
+            return sorted({position.symbol for position in self.positions.values()})
+
+    def mark(self, symbol, price):
+        with self._lock:
+            return sum(position.mark(price) for position in self.positions.values() if position.symbol == symbol)
+
+    def total_profit(self):
+        with self._lock:
+            return sum(position.profit for position in self.positions.values())
+
+    def clear(self):
+        with self._lock:
+            positions = list(self.positions.values())
+            self.positions.clear()
+            return positions
+
+    def snapshot(self):
+        with self._lock:
+            return [position.as_dict() for position in self.positions.values()]
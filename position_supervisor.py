@@ -0,0 +1,143 @@
+import threading
+import logging
+
+
+class TimerWheel:
+    def __init__(self, resolution=1.0, slots=64):
+        self.resolution = resolution
+        self.slots = [{} for _ in range(slots)]
+        self.deadlines = {}
+        self._cursor = None
+
+    def _tick(self, timestamp):
+        return int(timestamp // self.resolution)
+
+    def schedule(self, key, deadline):
+        self.cancel(key)
+        self.deadlines[key] = deadline
+        self.slots[self._tick(deadline) % len(self.slots)][key] = deadline
+
+    def cancel(self, key):
+        deadline = self.deadlines.pop(key, None)
+        if deadline is not None:
+            self.slots[self._tick(deadline) % len(self.slots)].pop(key, None)
+
+    def next_deadline(self):
+        return min(self.deadlines.values()) if self.deadlines else None
+
+    def expire(self, now):
+        current = self._tick(now)
+        start = current if self._cursor is None else self._cursor
+        # Çarkın bir turundan uzun süren boşluklarda her yuva yalnızca bir kez taranır
+        ticks = range(start, current + 1) if current - start < len(self.slots) else range(current - len(self.slots) + 1, current + 1)
+        expired = []
+        for tick in ticks:
+            slot = self.slots[tick % len(self.slots)]
+            for key, deadline in list(slot.items()):
+                if deadline <= now:
+                    del slot[key]
+                    del self.deadlines[key]
+                    expired.append(key)
+        self._cursor = current
+        return expired
+
+
+class PositionSupervisor:
+    def __init__(self, price_feed, clock, on_tick, on_timer, max_wait=3.0, resolution=1.0):
+        self.price_feed = price_feed
+        self.clock = clock
+        self.on_tick = on_tick
+        self.on_timer = on_timer
+        self.max_wait = max_wait
+        self.logger = logging.getLogger('BotLogger')
+        self.positions = {}
+        self.timers = TimerWheel(resolution)
+        self._lock = threading.Lock()
+        self._changed = False
+        self._stop = None
+        self._thread = None
+
+    def watch(self, key, contract, deadline=None):
+        with self._lock:
+            if key in self.positions:
+                self.price_feed.unsubscribe(self.positions[key]['contract'])
+            tick = self.price_feed.get(contract)
+            self.positions[key] = {'contract': contract, 'seq': tick['seq'] if tick else 0}
+            if deadline is not None:
+                self.timers.schedule(key, deadline)
+            self._changed = True
+            self.price_feed.subscribe(contract)
+            self._start()
+
+    def schedule(self, key, deadline):
+        with self._lock:
+            if key in self.positions:
+                self.timers.schedule(key, deadline)
+                self._changed = True
+        self.price_feed.notify()
+
+    def release(self, key):
+        with self._lock:
+            position = self.positions.pop(key, None)
+            self.timers.cancel(key)
+            self._changed = True
+        if position:
+            self.price_feed.unsubscribe(position['contract'])
+
+    def watching(self):
+        with self._lock:
+            return list(self.positions)
+
+    def _start(self):
+        # Durdurulan iş parçacığı bir işleyicide takılı olsa bile yeni pozisyonlar yeni bir iş parçacığıyla izlenir
+        if self._thread is None or not self._thread.is_alive() or self._stop.is_set():
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name="PositionSupervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            keys = list(self.positions)
+        for key in keys:
+            self.release(key)
+        self.price_feed.notify()
+        if timeout is not None and self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _dispatch(self, handler, key, *args):
+        try:
+            if handler(key, *args):
+                self.release(key)
+        except Exception as e:
+            self.logger.error(f"[position_supervisor.py:PositionSupervisor._dispatch] {key} pozisyonu işlenemedi: {e}")
+
+    def _run(self, stop):
+        while True:
+            with self._lock:
+                if stop.is_set() or not self.positions:
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                    return
+                self._changed = False
+                watches = [(key, position['contract'], position['seq']) for key, position in self.positions.items()]
+                deadline = self.timers.next_deadline()
+            timeout = self.max_wait if deadline is None else min(self.max_wait, max(0.0, deadline - self.clock.time()))
+            ticks = self.price_feed.wait_any([(contract, seq) for _, contract, seq in watches], timeout, wake=lambda: stop.is_set() or self._changed)
+            for key, contract, seq in watches:
+                if stop.is_set():
+                    break
+                tick = ticks.get(contract)
+                with self._lock:
+                    position = self.positions.get(key)
+                    if tick is None or position is None or position['seq'] >= tick['seq']:
+                        continue
+                    position['seq'] = tick['seq']
+                self._dispatch(self.on_tick, key, tick)
+            with self._lock:
+                if stop.is_set():
+                    continue
+                expired = [key for key in self.timers.expire(self.clock.time()) if key in self.positions]
+            for key in expired:
+                self._dispatch(self.on_timer, key)
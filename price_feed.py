@@ -0,0 +1,151 @@
+import threading
+import time
+import logging
+
+
+class PriceFeed:
+    def __init__(self, fetch_tickers, interval=3, batch_threshold=5):
+        self.fetch_tickers = fetch_tickers
+        self.interval = interval
+        self.batch_threshold = batch_threshold
+        self.logger = logging.getLogger('BotLogger')
+        self.prices = {}
+        self._subscribers = {}
+        self._waiting = {}
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = 0
+        self.polling = True
+        self.streamed = set()
+        self._failing = False
+
+    def subscribe(self, contract):
+        with self._cond:
+            self._subscribers[contract] = self._subscribers.get(contract, 0) + 1
+            self._start_polling()
+            self._cond.notify_all()
+
+    def _start_polling(self):
+        if self._stop.is_set():
+            # Durdurulan yoklayıcı kendi olayıyla çıkar; yeniden başlatma onun bitmesini beklemez
+            self._stop = threading.Event()
+            self._thread = None
+        if self.polling and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name="PriceFeed", daemon=True)
+            self._thread.start()
+
+    def set_polling(self, enabled, contracts=None):
+        with self._cond:
+            if contracts is None:
+                self.polling = enabled
+                if enabled:
+                    self.streamed.clear()
+            elif enabled:
+                self.streamed.difference_update(contracts)
+            else:
+                # Yalnızca akıştan fiyat alan kontratlar yoklamadan çıkarılır
+                self.streamed.update(contracts)
+            if self.polling and self._polled():
+                self._start_polling()
+
+    def _polled(self):
+        return [contract for contract in self._subscribers if contract not in self.streamed]
+
+    def unsubscribe(self, contract):
+        with self._cond:
+            count = self._subscribers.get(contract, 0) - 1
+            if count > 0:
+                self._subscribers[contract] = count
+            else:
+                self._subscribers.pop(contract, None)
+            self._cond.notify_all()
+
+    def subscribed(self):
+        with self._cond:
+            return list(self._subscribers)
+
+    def publish(self, contract, last, mark_price=None, timestamp=None):
+        with self._cond:
+            self._seq += 1
+            self.prices[contract] = {
+                'last': last,
+                'mark_price': mark_price if mark_price is not None else last,
+                'time': timestamp if timestamp is not None else time.time(),
+                'seq': self._seq,
+            }
+            self._cond.notify_all()
+
+    def get(self, contract):
+        return self.prices.get(contract)
+
+    def wait(self, contract, after_seq=0, timeout=None):
+        waiter = threading.get_ident()
+        with self._cond:
+            self._waiting[waiter] = [(contract, after_seq)]
+            self._cond.notify_all()
+            try:
+                self._cond.wait_for(
+                    lambda: self._stop.is_set() or self.prices.get(contract, {}).get('seq', 0) > after_seq,
+                    timeout
+                )
+            finally:
+                del self._waiting[waiter]
+            return self.prices.get(contract)
+
+    def wait_any(self, watches, timeout=None, wake=None):
+        # watches: izlenen her pozisyon için bir (kontrat, son görülen seq) çifti
+        waiter = threading.get_ident()
+        with self._cond:
+            self._waiting[waiter] = list(watches)
+            self._cond.notify_all()
+            try:
+                self._cond.wait_for(
+                    lambda: (wake is not None and wake()) or any(self.prices.get(contract, {}).get('seq', 0) > after_seq for contract, after_seq in watches),
+                    timeout
+                )
+            finally:
+                del self._waiting[waiter]
+            return {contract: self.prices[contract] for contract, after_seq in watches if self.prices.get(contract, {}).get('seq', 0) > after_seq}
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _idle(self, contract):
+        seq = self.prices.get(contract, {}).get('seq', 0)
+        waiting = sum(1 for watches in self._waiting.values() for name, after_seq in watches if name == contract and after_seq >= seq)
+        return waiting >= self._subscribers.get(contract, 0)
+
+    def wait_idle(self, contract, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._stop.is_set() or self._idle(contract), timeout)
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _run(self, stop):
+        while not stop.is_set():
+            with self._cond:
+                contracts = self._polled()
+                if not contracts or not self.polling:
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                    return
+            started = time.monotonic()
+            try:
+                tickers = self.fetch_tickers(contracts if len(contracts) <= self.batch_threshold else None)
+                for contract in contracts:
+                    if contract in tickers:
+                        last, mark_price = tickers[contract]
+                        self.publish(contract, last, mark_price)
+                if self._failing:
+                    self.logger.info("Fiyat akışı yeniden çalışıyor")
+                self._failing = False
+            except Exception as e:
+                if not self._failing:
+                    self.logger.error(f"[price_feed.py:PriceFeed._run] Fiyat alınamadı: {e}")
+                self._failing = True
+            stop.wait(max(0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,95 @@
+import argparse
+import os
+import time
+import logging
+from clock import SimulatedClock
+
+
+class ReplayDriver:
+    def __init__(self, logic, clock, tick_interval=3, timeframe='15m', speed=None, idle_timeout=30):
+        self.logic = logic
+        self.clock = clock
+        self.tick_interval = tick_interval
+        self.timeframe = timeframe
+        self.speed = speed
+        self.idle_timeout = idle_timeout
+        self.logger = logging.getLogger('BotLogger')
+
+    def _wait_idle(self):
+        for contract in self.logic.price_feed.subscribed():
+            if not self.logic.price_feed.wait_idle(contract, self.idle_timeout):
+                self.logger.warning(f"[replay.py:ReplayDriver._wait_idle] {contract} izleyicisi {self.idle_timeout} saniyede boşa çıkmadı")
+
+    def _publish(self):
+        self.logic.simulator.process_triggers()
+        for contract in self.logic.price_feed.subscribed():
+            price = self.logic.simulator.price_at(contract)
+            self.logic.price_feed.publish(contract, price, timestamp=self.clock.time())
+        self._wait_idle()
+
+    def _cycle(self):
+        self.logic.run_cycle(self.timeframe)
+        self._wait_idle()
+
+    def run(self, end):
+        started = time.perf_counter()
+        begin = self.clock.time()
+        self.logic.price_feed.set_polling(False)
+        if not self.logic.bot_running:
+            self.logic.start_bot()
+        next_cycle = begin
+        while self.clock.time() < end and self.logic.bot_running:
+            if self.clock.time() >= next_cycle:
+                self._cycle()
+                next_cycle += self.logic.cycle_interval
+            step = min(self.tick_interval, next_cycle - self.clock.time())
+            close_wait = self.logic.seconds_to_candle_close(self.timeframe) if self.logic.mum_sonu_bekle else None
+            if close_wait is not None and close_wait <= step:
+                self.clock.advance(close_wait)
+                self._publish()
+                self._cycle()
+                continue
+            self.clock.advance(step)
+            self._publish()
+            if self.speed:
+                time.sleep(self.tick_interval / self.speed)
+        self.logic.stop_bot()
+        elapsed = time.perf_counter() - started
+        result = {
+            'start': begin,
+            'end': self.clock.time(),
+            'elapsed': elapsed,
+            'speedup': (self.clock.time() - begin) / elapsed if elapsed else 0.0,
+            'balance': self.logic.balance,
+            'long_basarili': self.logic.long_basarili,
+            'long_basarisiz': self.logic.long_basarisiz,
+            'short_basarili': self.logic.short_basarili,
+            'short_basarisiz': self.logic.short_basarisiz,
+            'fills': list(self.logic.simulator.fills),
+        }
+        self.logger.info(
+            f"Tekrar oynatma tamamlandı: {(result['end'] - begin) / 3600:.1f} saat, {elapsed:.1f} saniyede ({result['speedup']:.0f}x), "
+            f"LONG {result['long_basarili']}/{result['long_basarisiz']}, SHORT {result['short_basarili']}/{result['short_basarisiz']}"
+        )
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kaydedilmiş mumları tüm karar ve izleme yolundan hızlandırılmış zamanla geçirir")
+    parser.add_argument("--symbol", default="DOGE_USDT")
+    parser.add_argument("--start", type=int, required=True, help="Başlangıç zamanı (unix saniye)")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--speed", type=float, default=None, help="Gerçek zamana göre hız (boş ise olabildiğince hızlı)")
+    parser.add_argument("--tick", type=float, default=3)
+    args = parser.parse_args()
+
+    os.environ["EXCHANGE_MODE"] = "sim"
+    os.environ.setdefault("METRICS_PORT", "0")
+    os.environ.setdefault("SIM_SYMBOLS", args.symbol)
+    from logic import BotLogic
+    clock = SimulatedClock(args.start)
+    logic = BotLogic(clock=clock)
+    logic.update_long_settings(symbol=args.symbol)
+    logic.update_short_settings(symbol=args.symbol)
+    result = ReplayDriver(logic, clock, tick_interval=args.tick, speed=args.speed).run(args.start + args.hours * 3600)
+    print({key: value for key, value in result.items() if key != 'fills'})
@@ -0,0 +1,95 @@
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from indicators import panel_indicators
+from strategy import long_signal, short_signal
+
+
+class RateLimiter:
+    def __init__(self, rate, per=1.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * self.per / self.rate
+            time.sleep(wait)
+
+
+class MarketScanner:
+    def __init__(self, logic, timeframe='15m', max_workers=8, requests_per_second=15):
+        self.logic = logic
+        self.timeframe = timeframe
+        self.logger = logging.getLogger('BotLogger')
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Scanner")
+        self.results = []
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, symbol):
+        try:
+            self.rate_limiter.acquire()
+            candles = self.logic.fetch_ohlcv(symbol, self.timeframe)
+            if candles is None or len(candles) < 7:
+                return None
+            return symbol, candles.series('close')[1]
+        except Exception as e:
+            self.logger.error(f"[scanner.py:MarketScanner._fetch] {symbol} taranamadı: {e}")
+            return None
+
+    def match(self, symbol, indicators, hour=None):
+        hour = self.logic.clock.now().hour if hour is None else hour
+        rsi = indicators['rsi']
+        ma7_distance = indicators['ma7_distance'] * 100
+        matches = []
+        for side, settings, signal in (
+            ('LONG', self.logic.long_settings, long_signal),
+            ('SHORT', self.logic.short_settings, short_signal),
+        ):
+            if hour not in settings['allowed_hours'] or not signal(settings, rsi, ma7_distance):
+                continue
+            matches.append({
+                'symbol': symbol,
+                'side': side,
+                'price': indicators['close'],
+                'rsi': rsi,
+                'ma7_distance': ma7_distance,
+                'score': abs(rsi - settings['rsi_threshold']) + abs(ma7_distance) - settings['ma7_threshold'] * 100,
+            })
+        return matches
+
+    def scan(self, symbols=None):
+        started = time.monotonic()
+        if symbols is None:
+            symbols = self.logic.contract_registry.names(suffix='_USDT')
+        fetched = [item for item in self.executor.map(self._fetch, symbols) if item is not None]
+        results = []
+        if fetched:
+            width = max(len(closes) for _, closes in fetched)
+            panel = np.full((len(fetched), width), np.nan)
+            for row, (_, closes) in enumerate(fetched):
+                panel[row, width - len(closes):] = closes
+            indicators = panel_indicators(panel)
+            hour = self.logic.clock.now().hour
+            for row, (symbol, _) in enumerate(fetched):
+                latest = {name: float(values[row, -1]) for name, values in indicators.items()}
+                if not np.isnan(latest['rsi']):
+                    results.extend(self.match(symbol, latest, hour))
+        results.sort(key=lambda result: result['score'], reverse=True)
+        self.results = results
+        self.logger.info(f"Piyasa taraması tamamlandı: {len(symbols)} sembol, {len(results)} eşleşme, {time.monotonic() - started:.1f} saniye")
+        return results
@@ -0,0 +1,41 @@
+DEFAULT_LONG_SETTINGS = {
+    'symbol': 'DOGE_USDT',
+    'tp_percent': 0.01,
+    'sl_percent': 0.017,
+    'leverage': 15,
+    'rsi_threshold': 20.0,
+    'rsi_condition': 'Küçüktür',
+    'ma7_threshold': 0.007,
+    'bollinger_band_break_pct': 0.0025,
+    'volatility_threshold': 0.5,
+    'allowed_hours': list(range(24))
+}
+
+DEFAULT_SHORT_SETTINGS = {
+    'symbol': 'DOGE_USDT',
+    'tp_percent': 0.01,
+    'sl_percent': 0.017,
+    'leverage': 15,
+    'rsi_threshold': 80.0,
+    'rsi_condition': 'Büyüktür',
+    'ma7_threshold': 0.007,
+    'bollinger_band_break_pct': 0.0025,
+    'volatility_threshold': 0.5,
+    'allowed_hours': list(range(24))
+}
+
+
+def long_signal(settings, rsi, ma7_distance):
+    if settings['rsi_condition'] == 'Küçüktür':
+        rsi_ok = rsi < settings['rsi_threshold']
+    else:
+        rsi_ok = rsi > settings['rsi_threshold']
+    return rsi_ok & (ma7_distance < -settings['ma7_threshold'] * 100)
+
+
+def short_signal(settings, rsi, ma7_distance):
+    if settings['rsi_condition'] == 'Büyüktür':
+        rsi_ok = rsi > settings['rsi_threshold']
+    else:
+        rsi_ok = rsi < settings['rsi_threshold']
+    return rsi_ok & (ma7_distance > settings['ma7_threshold'] * 100)
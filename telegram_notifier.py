@@ -1,22 +1,128 @@
-import telegram
+import queue
+import threading
+import time
 import logging
 import os
 from dotenv import load_dotenv
+from http_transport import shared_transport
+
+TELEGRAM_MAX_LENGTH = 4096
+
 
 class TelegramNotifier:
-    def __init__(self, log_file):
+    def __init__(self, log_file=None, bot_token=None, chat_id=None, max_queue=500, batch_size=20, overflow='drop_oldest', timeout=10, metrics=None):
         load_dotenv()
-        self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
+        self.bot_token = bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
+        self.chat_id = chat_id or os.getenv('TELEGRAM_CHAT_ID')
         if not self.bot_token or not self.chat_id:
             raise ValueError("TELEGRAM_BOT_TOKEN veya TELEGRAM_CHAT_ID çevresel değişkeni eksik")
-        self.bot = telegram.Bot(token=self.bot_token)
+        if overflow not in ('drop_oldest', 'drop_newest'):
+            raise ValueError(f"Geçersiz taşma politikası: {overflow}")
         self.logger = logging.getLogger('BotLogger')
         self.log_file = log_file
+        self.url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.timeout = timeout
+        self.metrics = metrics
+        self.session = shared_transport().session()
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="TelegramNotifier", daemon=True)
+        self._thread.start()
 
     def send_message(self, message):
         try:
-            self.bot.send_message(chat_id=self.chat_id, text=message)
-            self.logger.info(f"Telegram mesajı gönderildi: {message}")
-        except Exception as e:
-            self.logger.error(f"[telegram_notifier.py:TelegramNotifier.send_message] Telegram mesajı gönderilemedi: {e}")
\ No newline at end of file
+            self._queue.put_nowait(message)
+        except queue.Full:
+            dropped_message = message
+            with self._lock:
+                if self.overflow == 'drop_oldest':
+                    try:
+                        dropped_message = self._queue.get_nowait()
+                        self._queue.task_done()
+                    except queue.Empty:
+                        pass
+                    try:
+                        self._queue.put_nowait(message)
+                    except queue.Full:
+                        dropped_message = message
+                self.dropped += 1
+            self.logger.warning(f"[telegram_notifier.py:TelegramNotifier.send_message] Telegram kuyruğu dolu, mesaj düşürüldü: {dropped_message}")
+
+    def flush(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stop(self, timeout=5):
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self.session.close()
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is None:
+                self._queue.task_done()
+                return
+            batch = [message]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if message is None:
+                    stop = True
+                    break
+                batch.append(message)
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                batch.insert(0, f"({dropped} mesaj kuyruk dolduğu için düşürüldü)")
+            for text in self._chunk(batch):
+                started = time.perf_counter()
+                sent = self._post(text)
+                if self.metrics:
+                    self.metrics.observe("telegram_send", time.perf_counter() - started)
+                    if not sent:
+                        self.metrics.increment("telegram_errors")
+            for _ in range(len(batch) - (1 if dropped else 0) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _chunk(self, batch):
+        text = ""
+        for message in batch:
+            message = message[:TELEGRAM_MAX_LENGTH]
+            if text and len(text) + len(message) + 2 > TELEGRAM_MAX_LENGTH:
+                yield text
+                text = ""
+            text = f"{text}\n\n{message}" if text else message
+        if text:
+            yield text
+
+    def _post(self, text, retries=3):
+        for _ in range(retries):
+            try:
+                response = self.session.post(self.url, json={"chat_id": self.chat_id, "text": text}, timeout=self.timeout)
+                if response.status_code == 429:
+                    retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+                    time.sleep(retry_after)
+                    continue
+                if response.status_code != 200:
+                    raise Exception(f"Telegram API hatası: {response.text}")
+                self.logger.info(f"Telegram mesajı gönderildi: {text}")
+                return True
+            except Exception as e:
+                self.logger.error(f"[telegram_notifier.py:TelegramNotifier._post] Telegram mesajı gönderilemedi: {e}")
+                return False
+        self.logger.error(f"[telegram_notifier.py:TelegramNotifier._post] Telegram hız sınırı aşıldı, mesaj gönderilemedi: {text}")
+        return False
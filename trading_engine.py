@@ -0,0 +1,126 @@
+import math
+import queue
+import threading
+import time
+import logging
+
+
+class TradingEngine:
+    def __init__(self, logic, on_snapshot=None, timeframe='15m'):
+        self.logic = logic
+        self.timeframe = timeframe
+        self.logger = logging.getLogger('BotLogger')
+        self.listeners = [on_snapshot] if on_snapshot else []
+        self.last_snapshot = None
+        self.cycles = 0
+        self.late_cycles = 0
+        self.first_cycle = threading.Event()
+        self._commands = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="TradingEngine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._commands.put(None)
+        if self._thread:
+            self._thread.join(timeout)
+
+    def submit(self, func, *args, **kwargs):
+        self._commands.put((func, args, kwargs))
+
+    def start_bot(self):
+        self.submit(self.logic.start_bot)
+
+    def stop_bot(self):
+        self.submit(self.logic.stop_bot)
+
+    def publish(self):
+        try:
+            snapshot = self.logic.snapshot()
+        except Exception as e:
+            self.logger.error(f"[trading_engine.py:TradingEngine.publish] Durum özeti alınamadı: {e}")
+            return
+        self.last_snapshot = snapshot
+        for listener in list(self.listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                self.logger.error(f"[trading_engine.py:TradingEngine.publish] Durum özeti iletilemedi: {e}")
+
+    def _run_command(self, command):
+        func, args, kwargs = command
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            self.logger.error(f"[trading_engine.py:TradingEngine._run_command] {getattr(func, '__name__', func)} çalıştırılamadı: {e}")
+
+    def _close_wait(self):
+        if not (self.logic.bot_running and self.logic.mum_sonu_bekle):
+            return None
+        try:
+            return self.logic.seconds_to_candle_close(self.timeframe)
+        except Exception as e:
+            self.logger.error(f"[trading_engine.py:TradingEngine._close_wait] Mum kapanışı hesaplanamadı: {e}")
+            return None
+
+    def _cycle(self):
+        started = time.perf_counter()
+        try:
+            self.logic.run_cycle(self.timeframe)
+        except Exception as e:
+            self.logger.error(f"[trading_engine.py:TradingEngine._cycle] İşlem döngüsü hatası: {e}")
+        self.logic.metrics.observe("cycle", time.perf_counter() - started)
+        self.cycles += 1
+        self.first_cycle.set()
+        self.publish()
+
+    def _run(self):
+        self.publish()
+        next_cycle = time.monotonic()
+        while not self._stop.is_set():
+            timeout = max(0.0, next_cycle - time.monotonic())
+            close_wait = self._close_wait()
+            at_close = close_wait is not None and close_wait < timeout
+            try:
+                command = self._commands.get(timeout=close_wait if at_close else timeout)
+                if command is not None:
+                    was_running = self.logic.bot_running
+                    self._run_command(command)
+                    if self.logic.bot_running and not was_running:
+                        next_cycle = time.monotonic()
+                    self.publish()
+                continue
+            except queue.Empty:
+                pass
+            if at_close:
+                # Mum kapanışında bekleme modu: döngü takvimi kaydırılmadan kapanan mum işlenir
+                self._cycle()
+                continue
+            if self.logic.bot_running:
+                self._cycle()
+            else:
+                self.publish()
+            next_cycle += self.logic.cycle_interval
+            now = time.monotonic()
+            if next_cycle < now:
+                missed = math.ceil((now - next_cycle) / self.logic.cycle_interval)
+                self.late_cycles += 1
+                self.logger.warning(f"[trading_engine.py:TradingEngine._run] İşlem döngüsü gecikti, {missed} döngü atlandı")
+                next_cycle += missed * self.logic.cycle_interval
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                break
+            if command is not None:
+                self._run_command(command)